@@ -0,0 +1,540 @@
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import threading
+import statistics
+import tempfile
+import subprocess
+import http.client
+import urllib.request
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Environment variables
+load_dotenv()
+
+# Load test defaults
+BENCHMARK_MNEMONIC = "test test test test test test test test test test test junk"
+BENCHMARK_API_KEY = "benchmark"
+SCENARIOS = ("wallets", "wallet_transactions", "send", "transactions")
+
+
+# Send one GET request and return its latency in seconds
+def timed_get(host: str, path: str, api_key: str) -> float:
+    request = urllib.request.Request(f"{host}{path}", headers={"X-API-Key": api_key})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+# Compare N parallel requests against a single one
+def concurrency_benchmark(host: str, path: str, api_key: str, concurrency: int, rounds: int) -> dict:
+    # Warm up connections, caches and the thread pool
+    timed_get(host, path, api_key)
+
+    single = statistics.median(timed_get(host, path, api_key) for _ in range(rounds))
+
+    parallel_times = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            list(executor.map(lambda _: timed_get(host, path, api_key), range(concurrency)))
+            parallel_times.append(time.perf_counter() - started)
+    parallel = statistics.median(parallel_times)
+
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "single_seconds": round(single, 6),
+        "parallel_seconds": round(parallel, 6),
+        "slowdown": round(parallel / single, 2)
+    }
+
+
+# Fake Chain Class
+class FakeChain:
+    # Just enough of an Ethereum node for the API: accepts transactions and mines them every block_time
+    def __init__(self, chain_id: int, block_time: float):
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.lock = threading.Lock()
+        self.blocks = [self.make_block(0, [])]
+        self.mempool = []
+        self.receipts = {}
+        self.nonces = {}
+
+    def make_block(self, number: int, transactions: list[dict]) -> dict:
+        return {
+            'number': hex(number),
+            'hash': '0x%064x' % (number + 1),
+            'parentHash': '0x%064x' % number,
+            'timestamp': hex(int(time.time())),
+            'baseFeePerGas': hex(10 ** 9),
+            'gasUsed': hex(21000 * len(transactions)),
+            'gasLimit': hex(30000000),
+            'transactions': transactions
+        }
+
+    def produce_blocks(self):
+        while True:
+            time.sleep(self.block_time)
+            self.mine()
+
+    def mine(self):
+        # Recovering senders is slow, so it happens here rather than in eth_sendRawTransaction
+        from eth_account import Account
+        import rlp
+
+        with self.lock:
+            raw_transactions, self.mempool = self.mempool, []
+
+        transactions = []
+        for tx_hash, raw in raw_transactions:
+            typed = raw[0] == 2
+            fields = rlp.decode(raw[1:] if typed else raw)
+            to, value = (fields[5], fields[6]) if typed else (fields[3], fields[4])
+            transactions.append({
+                'hash': tx_hash,
+                'from': Account.recover_transaction(raw),
+                'to': '0x' + to.hex() if to else None,
+                'value': hex(int.from_bytes(value, 'big'))
+            })
+
+        with self.lock:
+            number = len(self.blocks)
+            self.blocks.append(self.make_block(number, transactions))
+            for tx in transactions:
+                sender = tx['from'].lower()
+                self.nonces[sender] = self.nonces.get(sender, 0) + 1
+                self.receipts[tx['hash']] = {
+                    'transactionHash': tx['hash'],
+                    'blockNumber': hex(number),
+                    'status': '0x1',
+                    'gasUsed': hex(21000),
+                    'effectiveGasPrice': hex(10 ** 9)
+                }
+
+    def handle(self, call: dict) -> dict:
+        method, params = call['method'], call.get('params', [])
+        with self.lock:
+            head = len(self.blocks) - 1
+            if method == 'eth_chainId':
+                result = hex(self.chain_id)
+            elif method == 'eth_blockNumber':
+                result = hex(head)
+            elif method == 'eth_getBalance':
+                result = hex(10 ** 24)
+            elif method == 'eth_gasPrice':
+                result = hex(10 ** 9)
+            elif method == 'eth_maxPriorityFeePerGas':
+                result = hex(10 ** 8)
+            elif method == 'eth_feeHistory':
+                result = self.fee_history(head, params)
+            elif method == 'eth_getTransactionCount':
+                result = hex(self.nonces.get(params[0].lower(), 0))
+            elif method == 'eth_getTransactionReceipt':
+                result = self.receipts.get(params[0])
+            elif method == 'eth_getBlockByNumber':
+                number = head if params[0] == 'latest' else int(params[0], 16)
+                block = self.blocks[number] if number <= head else None
+                if block is not None and not params[1]:
+                    block = {**block, 'transactions': [tx['hash'] for tx in block['transactions']]}
+                result = block
+            elif method == 'eth_sendRawTransaction':
+                from eth_utils import keccak
+                raw = bytes.fromhex(params[0][2:])
+                result = '0x' + keccak(raw).hex()
+                self.mempool.append((result, raw))
+            else:
+                return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32601, 'message': f"Method {method} not supported"}}
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'result': result}
+
+    def fee_history(self, head: int, params: list) -> dict:
+        block_count = params[0] if isinstance(params[0], int) else int(params[0], 16)
+        newest = head if params[1] in ('latest', 'pending') else min(int(params[1], 16), head)
+        blocks = self.blocks[max(newest - block_count + 1, 0):newest + 1]
+        # Tips grow with the percentile so slow, normal and fast sends get different fees
+        return {
+            'oldestBlock': blocks[0]['number'],
+            'baseFeePerGas': [block['baseFeePerGas'] for block in blocks] + [hex(10 ** 9)],
+            'gasUsedRatio': [int(block['gasUsed'], 16) / int(block['gasLimit'], 16) for block in blocks],
+            'reward': [[hex(10 ** 7 * (1 + percentile)) for percentile in params[2]] for _ in blocks]
+        }
+
+
+# Fake RPC Handler Class
+class FakeRPCHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    chain = None
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(self.latency)
+
+        if isinstance(body, list):
+            response = [self.chain.handle(call) for call in body]
+        else:
+            response = self.chain.handle(body)
+
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# Runs in its own process so the fake node doesn't compete with the load generator for the GIL
+def serve_fake_rpc(port: int, chain_id: int, latency: float, block_time: float):
+    FakeRPCHandler.chain = FakeChain(chain_id, block_time)
+    FakeRPCHandler.latency = latency
+    threading.Thread(target=FakeRPCHandler.chain.produce_blocks, daemon=True).start()
+    ThreadingHTTPServer(('127.0.0.1', port), FakeRPCHandler).serve_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, api_key: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            timed_get(url, "/version", api_key)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"API at {url} did not start within {timeout} seconds")
+
+
+# Start with an empty database so every run sees the same data
+def reset_database(args):
+    if args.backend == "sqlite":
+        args.sqlite_path = os.path.join(tempfile.mkdtemp(prefix="wallet-benchmark-"), "wallet.db")
+        return
+
+    import mysql.connector
+    db_name = args.db_name
+
+    conn = mysql.connector.connect(host=os.getenv('DB_HOST'), user=os.getenv('DB_USER'), password=os.getenv('DB_PASSWORD'))
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{db_name}`")
+    cursor.execute(f"CREATE DATABASE `{db_name}`")
+    cursor.close()
+    conn.close()
+
+
+def start_api(port: int, rpc_url: str, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        'X-API-Key': BENCHMARK_API_KEY,
+        'APP_VERSION': 'benchmark',
+        'ETH_RPC_URL': rpc_url,
+        'CHAIN_ID': str(args.chain_id),
+        'DB_BACKEND': args.backend,
+        'DB_NAME': args.db_name
+    }
+    if args.backend == "sqlite":
+        env['SQLITE_PATH'] = args.sqlite_path
+
+    if args.workers > 1:
+        # Same launcher as "python run.py" with API_WORKERS set
+        env['API_WORKERS'] = str(args.workers)
+        command = [sys.executable, '-c', f"import run; run.serve('127.0.0.1', {port})"]
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'run:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning']
+
+    return subprocess.Popen(
+        command,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env
+    )
+
+
+# Load Client Class
+class LoadClient:
+    # One keep-alive connection per worker thread
+    def __init__(self, url: str, api_key: str):
+        host, port = url.split("://", 1)[1].split(":")
+        self.conn = http.client.HTTPConnection(host, int(port), timeout=60)
+        self.headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
+
+    def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, float]:
+        started = time.perf_counter()
+        try:
+            self.conn.request(method, path, json.dumps(body) if body is not None else None, self.headers)
+            response = self.conn.getresponse()
+            response.read()
+            status = response.status
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            status = 0
+        return status, time.perf_counter() - started
+
+    def call(self, method: str, path: str, body: dict | None = None) -> dict:
+        self.conn.request(method, path, json.dumps(body) if body is not None else None, self.headers)
+        response = self.conn.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path} failed with {response.status}: {data}")
+        return data
+
+
+def seed(url: str, api_key: str, wallet_count: int, transaction_count: int, rng: random.Random) -> list[str]:
+    client = LoadClient(url, api_key)
+
+    # Wallets are derived from a fixed mnemonic, so every run creates the same addresses
+    addresses = []
+    while len(addresses) < wallet_count:
+        batch = client.call("POST", "/wallets/create/batch", {
+            "wallet_name": "benchmark",
+            "count": min(wallet_count - len(addresses), 10000),
+            "start_index": len(addresses),
+            "mnemonic_phrase": BENCHMARK_MNEMONIC
+        })
+        addresses.extend(wallet["address"] for wallet in batch["wallets"])
+
+    # Transaction history comes from batch sends between the seeded wallets
+    remaining = transaction_count
+    while remaining > 0:
+        transfers = [
+            {"from_address": rng.choice(addresses), "to_address": rng.choice(addresses), "amount": 0.0001}
+            for _ in range(min(remaining, 500))
+        ]
+        client.call("POST", "/wallet/send/batch", {"transfers": transfers})
+        remaining -= len(transfers)
+
+    return addresses
+
+
+def scenario_request(name: str, addresses: list[str], rng: random.Random) -> tuple[str, str, dict | None]:
+    if name == "wallets":
+        return "GET", "/wallets", None
+    if name == "wallet_transactions":
+        return "GET", f"/wallet/{rng.choice(addresses)}/transactions?limit=50", None
+    if name == "send":
+        return "POST", "/wallet/send", {"from_address": rng.choice(addresses), "to_address": rng.choice(addresses), "amount": 0.0001}
+    return "GET", "/transactions?limit=100", None
+
+
+def percentile(sorted_latencies: list[float], fraction: float) -> float:
+    index = min(len(sorted_latencies) - 1, int(fraction * len(sorted_latencies)))
+    return round(sorted_latencies[index] * 1000, 3)
+
+
+# Drive one endpoint with concurrent workers for a fixed duration
+def run_scenario(url: str, api_key: str, name: str, addresses: list[str], concurrency: int, duration: float, seed_value: int) -> dict:
+    def worker(worker_id: int) -> tuple[list[float], int]:
+        rng = random.Random(seed_value + worker_id)
+        client = LoadClient(url, api_key)
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            status, seconds = client.request(*scenario_request(name, addresses, rng))
+            latencies.append(seconds)
+            if status != 200:
+                errors += 1
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds for worker_latencies, _ in results for seconds in worker_latencies)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "throughput": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else None,
+        "p50_ms": percentile(latencies, 0.50) if latencies else None,
+        "p95_ms": percentile(latencies, 0.95) if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) if latencies else None
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def load_benchmark(args) -> dict:
+    rng = random.Random(args.seed)
+    rpc_port = args.rpc_port or free_port()
+    rpc_url = f"http://127.0.0.1:{rpc_port}"
+    fake_rpc = multiprocessing.Process(
+        target=serve_fake_rpc,
+        args=(rpc_port, args.chain_id, args.rpc_latency, args.block_time),
+        daemon=True
+    )
+    fake_rpc.start()
+
+    api = None
+    if args.api_url:
+        url, api_key = args.api_url, os.getenv("X-API-Key")
+    else:
+        reset_database(args)
+        url, api_key = f"http://127.0.0.1:{free_port()}", BENCHMARK_API_KEY
+        api = start_api(int(url.rsplit(":", 1)[1]), rpc_url, args)
+
+    try:
+        wait_until_ready(url, api_key, args.startup_timeout)
+        addresses = seed(url, api_key, args.wallets, args.transactions, rng)
+
+        results = {}
+        for name in args.scenarios:
+            results[name] = run_scenario(url, api_key, name, addresses, args.concurrency, args.duration, args.seed)
+    finally:
+        if api is not None:
+            api.terminate()
+            api.wait(timeout=30)
+        fake_rpc.terminate()
+
+    return {
+        "commit": git_commit(),
+        "config": {
+            "wallets": args.wallets,
+            "transactions": args.transactions,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "rpc_latency": args.rpc_latency,
+            "block_time": args.block_time,
+            "seed": args.seed,
+            "backend": args.backend,
+            "workers": args.workers
+        },
+        "results": results
+    }
+
+
+# Start the API several times and time each launch until /version first answers 200
+def startup_benchmark(args) -> dict:
+    rpc_port = args.rpc_port or free_port()
+    rpc_url = f"http://127.0.0.1:{rpc_port}"
+    fake_rpc = multiprocessing.Process(
+        target=serve_fake_rpc,
+        args=(rpc_port, args.chain_id, 0, args.block_time),
+        daemon=True
+    )
+    fake_rpc.start()
+    reset_database(args)
+
+    timings = []
+    try:
+        for _ in range(args.runs):
+            port = free_port()
+            url = f"http://127.0.0.1:{port}"
+            started = time.perf_counter()
+            api = start_api(port, rpc_url, args)
+            try:
+                deadline = time.monotonic() + args.startup_timeout
+                while True:
+                    try:
+                        timed_get(url, "/version", BENCHMARK_API_KEY)
+                        break
+                    except Exception:
+                        if time.monotonic() > deadline or api.poll() is not None:
+                            raise RuntimeError(f"API at {url} did not answer /version within {args.startup_timeout} seconds")
+                        time.sleep(0.005)
+                timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                api.terminate()
+                api.wait(timeout=30)
+    finally:
+        fake_rpc.terminate()
+
+    # The first launch creates the schema; later ones find it current and skip the DDL
+    restarts = timings[1:]
+    return {
+        "commit": git_commit(),
+        "config": {
+            "runs": args.runs,
+            "backend": args.backend,
+            "workers": args.workers
+        },
+        "results": {
+            "fresh_database_ms": round(timings[0], 1),
+            "restart_ms": {
+                "p50": round(statistics.median(restarts), 1),
+                "min": round(min(restarts), 1),
+                "max": round(max(restarts), 1)
+            } if restarts else None
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BRSK ETH Wallet API benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    concurrency_parser = subparsers.add_parser("concurrency", help="Compare N parallel requests against a single one on a running API")
+    concurrency_parser.add_argument("--host", default=os.getenv("HOST", "http://localhost:8000"))
+    concurrency_parser.add_argument("--path", default="/wallets")
+    concurrency_parser.add_argument("--concurrency", type=int, default=10)
+    concurrency_parser.add_argument("--rounds", type=int, default=5)
+
+    load_parser = subparsers.add_parser("load", help="Seed a fresh API backed by a fake node and measure throughput and latency")
+    load_parser.add_argument("--wallets", type=int, default=100)
+    load_parser.add_argument("--transactions", type=int, default=1000)
+    load_parser.add_argument("--concurrency", type=int, default=10)
+    load_parser.add_argument("--duration", type=float, default=10, help="Seconds per scenario")
+    load_parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    load_parser.add_argument("--rpc-latency", type=float, default=0.05, help="Seconds the fake node waits before answering")
+    load_parser.add_argument("--block-time", type=float, default=2, help="Seconds between fake blocks")
+    load_parser.add_argument("--chain-id", type=int, default=11155111)
+    load_parser.add_argument("--backend", choices=["mysql", "sqlite"], default=os.getenv("DB_BACKEND", "mysql"))
+    load_parser.add_argument("--workers", type=int, default=1, help="API worker processes")
+    load_parser.add_argument("--db-name", default="wallet_benchmark", help="MySQL database dropped and recreated for the run")
+    load_parser.add_argument("--rpc-port", type=int, help="Port for the fake node (default: any free port)")
+    load_parser.add_argument("--api-url", help="Use an already running API, started with ETH_RPC_URL=http://127.0.0.1:<rpc-port>, instead of starting one")
+    load_parser.add_argument("--startup-timeout", type=float, default=60)
+    load_parser.add_argument("--seed", type=int, default=1)
+    load_parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    startup_parser = subparsers.add_parser("startup", help="Measure the time from launching the API to its first 200 on /version")
+    startup_parser.add_argument("--runs", type=int, default=5, help="Launches; the first one starts from an empty database")
+    startup_parser.add_argument("--block-time", type=float, default=2, help="Seconds between fake blocks")
+    startup_parser.add_argument("--chain-id", type=int, default=11155111)
+    startup_parser.add_argument("--backend", choices=["mysql", "sqlite"], default=os.getenv("DB_BACKEND", "mysql"))
+    startup_parser.add_argument("--workers", type=int, default=1, help="API worker processes")
+    startup_parser.add_argument("--db-name", default="wallet_benchmark", help="MySQL database dropped and recreated for the run")
+    startup_parser.add_argument("--rpc-port", type=int, help="Port for the fake node (default: any free port)")
+    startup_parser.add_argument("--startup-timeout", type=float, default=60)
+    startup_parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.command == "concurrency":
+        api_key = os.getenv("X-API-Key")
+        if not api_key:
+            print("Error: X-API-Key not found in .env")
+            sys.exit(1)
+        result = concurrency_benchmark(args.host, args.path, api_key, args.concurrency, args.rounds)
+    elif args.command == "startup":
+        result = startup_benchmark(args)
+    else:
+        result = load_benchmark(args)
+
+    print(json.dumps(result, indent=2))
+    if getattr(args, "output", None):
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
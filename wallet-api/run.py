@@ -1,19 +1,69 @@
-from fastapi import FastAPI, HTTPException, Security, Depends
+from fastapi import FastAPI, HTTPException, Security, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security.api_key import APIKeyHeader
+from fastapi.routing import APIRoute
 from starlette.status import HTTP_403_FORBIDDEN
-from web3 import Web3
-from eth_account import Account
 import mysql.connector
+import sqlite3
 from pydantic import BaseModel
 import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import statistics
+import base64
+import threading
+import contextvars
+import queue
+import socket
+import mmap
+import struct
+import zlib
+import tempfile
+import multiprocessing
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from contextlib import contextmanager
+import anyio
 from dotenv import load_dotenv
 from decimal import Decimal
-from datetime import datetime
-from eth_account.hdaccount import generate_mnemonic
+from datetime import datetime, timezone
+from typing import Literal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+from urllib3.exceptions import NewConnectionError
+import requests
+from itertools import repeat
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+try:
+    import fcntl
+except ImportError:  # Windows: a single worker only
+    fcntl = None
+
+# prometheus_client picks its storage when it is imported, so this is read before .env is loaded
+MULTIPROCESS_METRICS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
 
 # Environment variables
 load_dotenv()
 
+# Multi-worker mode
+API_WORKERS = int(os.getenv('API_WORKERS', 1))
+WORKER_RUN_DIR = os.getenv('WORKER_RUN_DIR') or os.path.join(tempfile.gettempdir(), f"wallet-api-{os.getppid()}")
+WORKER_SEND_TIMEOUT = float(os.getenv('WORKER_SEND_TIMEOUT', 1))
+WORKER_MESSAGE_BYTES = 65536  # Largest datagram a worker reads; longer ones would be cut off
+WORKER_MESSAGE_ADDRESSES = 1000  # Addresses per 'balances' message, about 46 KB of JSON
+
+# Request instrumentation
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'true').lower() == 'true'
+METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'false').lower() == 'true'
+
+# Event streaming
+EVENT_QUEUE_SIZE = int(os.getenv('EVENT_QUEUE_SIZE', 1000))
+EVENT_KEEPALIVE = float(os.getenv('EVENT_KEEPALIVE', 15))
+
 # Base Models
 class VersionResponse(BaseModel):
     version: str
@@ -27,6 +77,34 @@ class WalletResponse(BaseModel):
     wallet_name: str
     mnemonic_phrase: str | None = None
 
+class WalletCreateBatch(BaseModel):
+    wallet_name: str
+    count: int
+    start_index: int = 0
+    mnemonic_phrase: str | None = None
+
+class WalletBatchEntry(BaseModel):
+    address: str
+    derivation_index: int
+
+class WalletCreateBatchResponse(BaseModel):
+    mnemonic_phrase: str
+    wallets: list[WalletBatchEntry]
+    seconds: float
+    wallets_per_second: float
+
+class WalletImportError(BaseModel):
+    line: int
+    error: str
+
+class WalletImportBulkResponse(BaseModel):
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: list[WalletImportError] = []
+    seconds: float = 0.0
+    wallets_per_second: float = 0.0
+
 class WalletListResponse(BaseModel):
     address: str
     wallet_name: str
@@ -41,7 +119,33 @@ class WalletSend(BaseModel):
     from_address: str
     to_address: str
     amount: float
-    private_key: str
+    private_key: str | None = None
+    urgency: Literal["slow", "normal", "fast"] = "normal"
+
+class WalletSendBatch(BaseModel):
+    transfers: list[WalletSend]
+
+class TransferResult(BaseModel):
+    from_address: str
+    to_address: str
+    amount: float
+    tx_hash: str | None = None
+    error: str | None = None
+
+class WalletSendBatchResponse(BaseModel):
+    results: list[TransferResult]
+
+class WalletStatsResponse(BaseModel):
+    address: str
+    transaction_count: int = 0
+    pending_count: int = 0
+    success_count: int = 0
+    failed_count: int = 0
+    sent_count: int = 0
+    sent_amount: float = 0.0
+    received_count: int = 0
+    received_amount: float = 0.0
+    gas_spent: float = 0.0
 
 class TransactionResponse(BaseModel):
     id: int
@@ -52,57 +156,678 @@ class TransactionResponse(BaseModel):
     amount: float
     gas_used: float
     status: str
+    direction: str = "OUT"
     created_at: datetime
 
 
-# Database Manager Class
-class DatabaseManager:
+# Metrics Class
+class Metrics:
+    # Label children are created once and reused so hot paths skip the label lookup
+    DB_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'OTHER')
+
     def __init__(self):
-        self.db_config = {
-            'host': os.getenv('DB_HOST'),
-            'user': os.getenv('DB_USER'),
-            'password': os.getenv('DB_PASSWORD'),
-            'database': os.getenv('DB_NAME')
+        self.request_latency = Histogram('wallet_api_request_seconds', 'API request latency', ['method', 'route'])
+        self.rpc_latency = Histogram('wallet_api_rpc_seconds', 'JSON-RPC request latency', ['method', 'batch'])
+        self.rpc_calls = Counter('wallet_api_rpc_calls', 'JSON-RPC calls, counting each call inside a batch', ['method'])
+        self.rpc_errors = Counter('wallet_api_rpc_errors', 'JSON-RPC requests that raised', ['method'])
+        self.db_latency = Histogram('wallet_api_db_query_seconds', 'Database statement latency', ['statement'])
+        # Gauge modes only matter with PROMETHEUS_MULTIPROC_DIR: pools add up across workers, the rest come from the leader
+        self.db_connections = Gauge('wallet_api_db_connections', 'Database pool connections', ['pool', 'state'], multiprocess_mode='livesum')
+        self.db_pool_waits = Gauge('wallet_api_db_pool_waits', 'Connection requests that had to wait for the pool', ['pool'], multiprocess_mode='livesum')
+        self.db_pool_timeouts = Gauge('wallet_api_db_pool_timeouts', 'Connection requests that timed out', ['pool'], multiprocess_mode='livesum')
+        self.pending_transactions = Gauge('wallet_api_pending_transactions', 'Transactions still PENDING', multiprocess_mode='livemax')
+        self.refresh_latency = Histogram('wallet_api_refresh_seconds', 'refresh_transactions duration')
+        self.refresh_lag = Gauge('wallet_api_refresh_lag_seconds', 'Seconds since refresh_transactions last finished', multiprocess_mode='livemax')
+        self.rpc_hedges = Counter('wallet_api_rpc_hedges', 'Read requests repeated on a second endpoint', ['method'])
+        self.rpc_failovers = Counter('wallet_api_rpc_failovers', 'Requests retried on another endpoint after an error', ['method'])
+        self.refresh_finished_at = time.monotonic()
+        if not MULTIPROCESS_METRICS:
+            self.refresh_lag.set_function(lambda: time.monotonic() - self.refresh_finished_at)
+
+        self.children = {}
+        self.db_children = {statement: self.db_latency.labels(statement) for statement in self.DB_STATEMENTS}
+
+    def child(self, metric, *labels):
+        key = (metric, labels)
+        child = self.children.get(key)
+        if child is None:
+            child = self.children[key] = metric.labels(*labels)
+        return child
+
+    def observe_request(self, method: str, route: str, seconds: float):
+        self.child(self.request_latency, method, route).observe(seconds)
+
+    def observe_rpc(self, method: str, calls: int, seconds: float, failed: bool):
+        self.child(self.rpc_latency, method, 'true' if calls > 1 else 'false').observe(seconds)
+        self.child(self.rpc_calls, method).inc(calls)
+        if failed:
+            self.child(self.rpc_errors, method).inc()
+
+    def observe_query(self, query: str, seconds: float):
+        statement = query.lstrip()[:6].upper()
+        self.db_children.get(statement, self.db_children['OTHER']).observe(seconds)
+
+    def observe_refresh(self, seconds: float):
+        self.refresh_latency.observe(seconds)
+        self.refresh_finished_at = time.monotonic()
+
+    def observe_refresh_lag(self):
+        # Multiprocess gauges cannot be computed at scrape time, so the leader writes the lag periodically
+        self.refresh_lag.set(time.monotonic() - self.refresh_finished_at)
+
+    def observe_pool(self, pool: str, stats: dict):
+        for state in ('open', 'in_use', 'idle'):
+            self.child(self.db_connections, pool, state).set(stats[state])
+        self.child(self.db_pool_waits, pool).set(stats['waits'])
+        self.child(self.db_pool_timeouts, pool).set(stats['timeouts'])
+
+
+# Request Timings Class
+class RequestTimings:
+    # Time one request spends in the database, JSON-RPC calls and response serialization
+    SPANS = (('db', 'statement'), ('rpc', 'request'))
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {'db': [0.0, 0], 'rpc': [0.0, 0], 'serialize': [0.0, 0]}
+        self.endpoint_done = None
+        self.samples = None  # Folded stack -> count, while the slow request profiler samples this request
+
+    def add(self, span: str, seconds: float, count: int = 1):
+        totals = self.spans[span]
+        totals[0] += seconds
+        totals[1] += count
+
+    def header(self) -> str:
+        parts = []
+        for span, unit in self.SPANS:
+            seconds, count = self.spans[span]
+            parts.append(f'{span};dur={seconds * 1000:.1f};desc="{count} {unit}{"" if count == 1 else "s"}"')
+        if self.endpoint_done is not None:
+            parts.append(f"serialize;dur={self.spans['serialize'][0] * 1000:.1f}")
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ', '.join(parts)
+
+    def as_dict(self) -> dict:
+        return {span: {'ms': round(seconds * 1000, 3), 'count': count} for span, (seconds, count) in self.spans.items()}
+
+
+# Set by MetricsMiddleware; the thread pool copies the context, so sync endpoints see the same object
+request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def record_span(span: str, seconds: float, count: int = 1):
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add(span, seconds, count)
+
+
+# Metrics Middleware Class
+class MetricsMiddleware:
+    # Plain ASGI middleware, timing each request under its route template and adding a Server-Timing header
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                # Callers without a valid API key don't learn how long the database or node took
+                if SERVER_TIMING and status != HTTP_403_FORBIDDEN:
+                    message = {**message, 'headers': [*message.get('headers', ()), (b'server-timing', timings.header().encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            elapsed = time.perf_counter() - timings.started
+            route = scope.get('route')
+            route_path = route.path if route else 'unmatched'
+            metrics.observe_request(scope['method'], route_path, elapsed)
+            if timings.samples is not None:
+                request_profiler.finish(timings, scope, route_path, status, elapsed)
+
+
+# Timed Route Class
+class TimedRoute(APIRoute):
+    # Marks when the endpoint returns, so the rest of the handler (validation and JSON encoding) counts as serialization
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            response = await handler(request)
+            timings = request_timings.get()
+            if timings is not None and timings.endpoint_done is not None:
+                timings.add('serialize', time.perf_counter() - timings.endpoint_done)
+            return response
+
+        return timed_handler
+
+
+def timed_endpoint(endpoint):
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def run_async(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings = request_timings.get()
+                if timings is not None:
+                    timings.endpoint_done = time.perf_counter()
+        return run_async
+
+    # Sync endpoints have a worker thread to themselves, which the slow request profiler can sample
+    @wraps(endpoint)
+    def run_sync(*args, **kwargs):
+        timings = request_timings.get()
+        if timings is None:
+            return endpoint(*args, **kwargs)
+        if request_profiler is not None:
+            request_profiler.track(timings)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            if request_profiler is not None:
+                request_profiler.untrack()
+            timings.endpoint_done = time.perf_counter()
+    return run_sync
+
+
+# Instrumented HTTP Provider Class
+class InstrumentedHTTPProvider:
+    # Times every request to one endpoint; web3 is only imported once the first endpoint is built
+    def __init__(self, url: str, **kwargs):
+        from web3 import HTTPProvider
+        self.provider = HTTPProvider(url, **kwargs)
+
+    def is_connected(self) -> bool:
+        return self.provider.is_connected()
+
+    def make_request(self, method, params):
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self.provider.make_request(method, params)
+            failed = False
+            return response
+        finally:
+            metrics.observe_rpc(method, 1, time.perf_counter() - started, failed)
+
+    def make_batch_request(self, batch_requests):
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self.provider.make_batch_request(batch_requests)
+            failed = False
+            return response
+        finally:
+            # batch_call sends one method per batch
+            metrics.observe_rpc(batch_requests[0][0] if batch_requests else 'empty', len(batch_requests), time.perf_counter() - started, failed)
+
+
+# RPC Endpoint Class
+class RPCEndpoint:
+    def __init__(self, url: str, timeout: float):
+        # Retries are left to the pool, which can move on to another endpoint instead
+        self.provider = InstrumentedHTTPProvider(url, request_kwargs={'timeout': timeout}, exception_retry_configuration=None)
+        self.name = urlparse(url).netloc  # Keeps API keys in the path out of /stats
+        self.latency = None
+        self.failures = 0
+        self.unhealthy_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return self.unhealthy_until <= now
+
+    def stats(self) -> dict:
+        return {
+            'endpoint': self.name,
+            'latency': round(self.latency, 6) if self.latency is not None else None,
+            'failures': self.failures,
+            'healthy': self.healthy(time.monotonic())
         }
-        self.version = os.getenv('APP_VERSION')
 
-    def create_connection(self):
+
+def is_unsent_error(error: Exception) -> bool:
+    # Only errors raised before the request left us prove the node never saw it
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+# RPC Provider Pool Class
+class RPCProviderPool:
+    # Sends each call to the fastest healthy endpoint; slow reads are repeated on the runner-up.
+    # Build it with create(), which mixes in web3's JSONBaseProvider once web3 is imported.
+    HEDGED_METHODS = {
+        'eth_getBalance', 'eth_getTransactionReceipt', 'eth_gasPrice', 'eth_blockNumber',
+        'eth_chainId', 'eth_getTransactionCount', 'eth_getBlockByNumber', 'eth_feeHistory',
+        'eth_maxPriorityFeePerGas'
+    }
+    LATENCY_WEIGHT = 0.2
+
+    def __init__(self, urls: list[str], hedge_delay: float, cooldown: float, timeout: float):
+        super().__init__()
+        self.endpoints = [RPCEndpoint(url, timeout) for url in urls]
+        self.hedge_delay = hedge_delay
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.hedge_threads = int(os.getenv('RPC_HEDGE_THREADS', 32))
+        self.hedge_busy = 0  # Requests running on the hedge threads, including the losers of earlier races
+        self.executor = ThreadPoolExecutor(max_workers=self.hedge_threads, thread_name_prefix='rpc-hedge')
+
+    @classmethod
+    def create(cls, *args):
+        from web3.providers.base import JSONBaseProvider
+        return type(cls.__name__, (cls, JSONBaseProvider), {})(*args)
+
+    def ranked(self) -> list[RPCEndpoint]:
+        # Healthy endpoints first, fastest first; endpoints without samples yet get tried early
+        now = time.monotonic()
+        with self.lock:
+            return sorted(self.endpoints, key=lambda endpoint: (not endpoint.healthy(now), endpoint.latency or 0.0))
+
+    def call(self, endpoint: RPCEndpoint, send):
+        started = time.monotonic()
         try:
-            conn = mysql.connector.connect(**self.db_config)
+            response = send(endpoint.provider)
+        except Exception:
+            with self.lock:
+                endpoint.failures += 1
+                endpoint.unhealthy_until = time.monotonic() + self.cooldown * 2 ** min(endpoint.failures - 1, 5)
+            raise
+
+        elapsed = time.monotonic() - started
+        with self.lock:
+            endpoint.failures = 0
+            endpoint.unhealthy_until = 0.0
+            if endpoint.latency is None:
+                endpoint.latency = elapsed
+            else:
+                endpoint.latency += self.LATENCY_WEIGHT * (elapsed - endpoint.latency)
+        return response
+
+    def submit(self, endpoint: RPCEndpoint, send):
+        # Only hands the request to a free hedge thread; queueing behind slow losers would defeat the hedge
+        with self.lock:
+            if self.hedge_busy >= self.hedge_threads:
+                return None
+            self.hedge_busy += 1
+
+        def run():
+            try:
+                return self.call(endpoint, send)
+            finally:
+                with self.lock:
+                    self.hedge_busy -= 1
+        return self.executor.submit(run)
+
+    def send_in_turn(self, method: str, endpoints: list[RPCEndpoint], send):
+        # Reads are safe to repeat, so any error moves on to the next endpoint
+        error = None
+        for index, endpoint in enumerate(endpoints):
+            try:
+                return self.call(endpoint, send)
+            except Exception as e:
+                error = e
+                if index + 1 < len(endpoints):
+                    metrics.child(metrics.rpc_failovers, method).inc()
+        raise error
+
+    def send_hedged(self, method: str, send):
+        # A single endpoint can't be hedged, so the default setup never leaves the caller's thread
+        if len(self.endpoints) == 1:
+            return self.call(self.endpoints[0], send)
+
+        remaining = self.ranked()
+        pending = {}  # future -> (endpoint, started)
+        error = None
+
+        def launch() -> bool:
+            future = self.submit(remaining[0], send)
+            if future is None:
+                return False
+            pending[future] = (remaining.pop(0), time.monotonic())
+            return True
+
+        # Racing needs the first request off the caller's thread; with every hedge thread taken, go in turn instead
+        if not launch():
+            return self.send_in_turn(method, remaining, send)
+        done, _ = wait(pending, timeout=self.hedge_delay)
+        while True:
+            for future in done:
+                pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+
+                # Endpoints that lost the race are at least as slow as they have been so far
+                now = time.monotonic()
+                with self.lock:
+                    for endpoint, started in pending.values():
+                        endpoint.latency = max(endpoint.latency or 0.0, now - started)
+                return response
+
+            # Bring in the next endpoint when the current ones are slow or have failed
+            if remaining and (not done or not pending):
+                if done:
+                    metrics.child(metrics.rpc_failovers, method).inc()
+                if launch():
+                    if not done:
+                        metrics.child(metrics.rpc_hedges, method).inc()
+                elif not pending:
+                    return self.send_in_turn(method, remaining, send)
+
+            if not pending:
+                raise error
+            done, _ = wait(pending, timeout=self.hedge_delay if remaining else None, return_when=FIRST_COMPLETED)
+
+    def send_once(self, method: str, send):
+        # Writes are never duplicated: move on only when the request provably never reached the node
+        error = None
+        for endpoint in self.ranked():
+            try:
+                return self.call(endpoint, send)
+            except Exception as e:
+                if not is_unsent_error(e):
+                    raise
+                metrics.child(metrics.rpc_failovers, method).inc()
+                error = e
+        raise error
+
+    def make_request(self, method, params):
+        send = lambda provider: provider.make_request(method, params)
+        # Timed here rather than per endpoint: hedged copies run in other threads and overlap
+        started = time.perf_counter()
+        try:
+            if method in self.HEDGED_METHODS:
+                return self.send_hedged(method, send)
+            return self.send_once(method, send)
+        finally:
+            record_span('rpc', time.perf_counter() - started)
+
+    def make_batch_request(self, batch_requests):
+        send = lambda provider: provider.make_batch_request(batch_requests)
+        method = batch_requests[0][0] if batch_requests else 'empty'
+        started = time.perf_counter()
+        try:
+            if all(request_method in self.HEDGED_METHODS for request_method, _ in batch_requests):
+                return self.send_hedged(method, send)
+            return self.send_once(method, send)
+        finally:
+            record_span('rpc', time.perf_counter() - started)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return any(endpoint.provider.is_connected() for endpoint in self.ranked())
+
+    def stats(self) -> list[dict]:
+        with self.lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
+
+
+# Connection Pool Class
+class ConnectionPool:
+    def __init__(self, connect, size: int, max_overflow: int, timeout: float, ping_after: float):
+        self.connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.idle = []
+        self.condition = threading.Condition()
+        self.open_count = 0
+        self.in_use = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+
+    def acquire(self):
+        started = time.monotonic()
+        waited = False
+        conn = None
+
+        with self.condition:
+            while True:
+                if self.idle:
+                    conn, returned_at = self.idle.pop()
+                    break
+                if self.open_count < self.size + self.max_overflow:
+                    self.open_count += 1
+                    break
+
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise HTTPException(status_code=503, detail="Database error: connection pool exhausted")
+                waited = True
+                self.condition.wait(remaining)
+
+            self.in_use += 1
+            if waited:
+                self.waits += 1
+                self.wait_time += time.monotonic() - started
+
+        try:
+            # Connections that sat idle for a while may have been dropped by the server
+            if conn is not None and time.monotonic() - returned_at >= self.ping_after and not conn.is_connected():
+                self.close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self.connect()
+            record_span('db', time.monotonic() - started, 0)
             return conn
-        except mysql.connector.Error as e:
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        except Exception:
+            with self.condition:
+                self.open_count -= 1
+                self.in_use -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, conn):
+        try:
+            # End the request's transaction so the next borrower gets a fresh snapshot
+            conn.rollback()
+            healthy = True
+        except Exception:
+            healthy = False
+
+        with self.condition:
+            self.in_use -= 1
+            keep = healthy and len(self.idle) < self.size
+            if keep:
+                self.idle.append((conn, time.monotonic()))
+            else:
+                self.open_count -= 1
+            self.condition.notify()
+
+        if not keep:
+            self.close_quietly(conn)
+
+    def close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self.open_count,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                'waits': self.waits,
+                'wait_time': round(self.wait_time, 6),
+                'timeouts': self.timeouts
+            }
+
+
+# Timed Cursor Class
+class TimedCursor:
+    # Behaves like the wrapped cursor, but records how long each statement takes
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, query, params=None):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(query, params)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe_query(query, elapsed)
+            record_span('db', elapsed)
+
+    def executemany(self, query, params):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, params)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe_query(query, elapsed)
+            record_span('db', elapsed)
+
+    # Unbuffered MySQL cursors read rows while fetching, so that time counts towards the request's db span too
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return self._cursor.fetchone()
+        finally:
+            record_span('db', time.perf_counter() - started, 0)
+
+    def fetchmany(self, size=1):
+        started = time.perf_counter()
+        try:
+            return self._cursor.fetchmany(size)
+        finally:
+            record_span('db', time.perf_counter() - started, 0)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return self._cursor.fetchall()
+        finally:
+            record_span('db', time.perf_counter() - started, 0)
+
+
+# Pooled Connection Class
+class PooledConnection:
+    # Behaves like the wrapped connection, but close() hands it back to the pool
+    def __init__(self, pool: ConnectionPool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, **kwargs):
+        return TimedCursor(self._conn.cursor(**kwargs))
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+
+# Database Manager Class
+class DatabaseManager:
+    # Schema, migrations and every query the API runs; subclasses supply connections and dialect details
+    id_column = "INT AUTO_INCREMENT PRIMARY KEY"
+    address_column = "VARCHAR(42)"
+    param = "%s"  # The driver's placeholder; queries are built with it instead of rewritten for each backend
+    Error = Exception
+
+    def __init__(self):
+        self.version = os.getenv('APP_VERSION')
+
+    def create_pool(self, connect, size: int, max_overflow: int) -> ConnectionPool:
+        return ConnectionPool(
+            connect,
+            size,
+            max_overflow,
+            float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            float(os.getenv('DB_POOL_PING_AFTER', 1))
+        )
+
+    def get_connection(self, readonly: bool = False) -> PooledConnection:
+        return PooledConnection(self.pool, self.pool.acquire())
+
+    def pools(self) -> dict[str, ConnectionPool]:
+        return {'db_pool': self.pool}
 
     def init_database(self):
-        conn = self.create_connection()
+        # Every API worker runs this at startup; the lock lets one of them apply the schema at a time
+        if self.schema_is_current():
+            return
+        with self.migration_lock():
+            self.create_schema()
+
+    def schema_is_current(self) -> bool:
+        # One read instead of the CREATE/ALTER round trips (and the migration lock) on an up-to-date database
+        conn = self.get_connection(readonly=True)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT version, schema_version FROM wallet_manager")
+            rows = cursor.fetchall()
+        except self.Error:
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+        return len(rows) == 1 and rows[0][0] == self.version and rows[0][1] == self.migrations()[-1][0]
+
+    def migration_lock(self):
+        raise NotImplementedError
+
+    def create_schema(self):
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
-            cursor.execute("""
+            cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS wallet_manager (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    id {self.id_column},
                     version VARCHAR(10),
+                    schema_version INT NOT NULL DEFAULT 0,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
 
-            cursor.execute("""
+            cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS wallets (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    address VARCHAR(42) UNIQUE,
+                    id {self.id_column},
+                    address {self.address_column} UNIQUE,
                     private_key VARCHAR(66),
                     wallet_name VARCHAR(100),
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
 
-            cursor.execute("""
+            cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS transactions (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    id {self.id_column},
                     wallet_id INT,
                     tx_hash VARCHAR(66),
-                    from_address VARCHAR(42),
-                    to_address VARCHAR(42),
+                    from_address {self.address_column},
+                    to_address {self.address_column},
                     amount DECIMAL(18,8),
                     gas_used DECIMAL(18,8),
                     status VARCHAR(20),
@@ -111,19 +836,35 @@ class DatabaseManager:
                 )
             """)
 
-            cursor.execute("SELECT version FROM wallet_manager LIMIT 1")
+            if not self.column_exists(cursor, 'wallet_manager', 'schema_version'):
+                cursor.execute("ALTER TABLE wallet_manager ADD COLUMN schema_version INT NOT NULL DEFAULT 0")
+
+            cursor.execute("SELECT version, schema_version FROM wallet_manager LIMIT 1")
             result = cursor.fetchone()
 
             if result is None:
-                cursor.execute("""
-                    INSERT INTO wallet_manager (version)
-                    VALUES (%s)
+                cursor.execute(f"""
+                    INSERT INTO wallet_manager (version, schema_version)
+                    VALUES ({self.param}, 0)
                 """, (self.version,))
-            elif result[0] != self.version:
-                cursor.execute("""
+                schema_version = 0
+            else:
+                schema_version = result[1]
+            conn.commit()
+
+            # Apply every migration newer than the stored schema version, in order
+            for migration_version, migration in self.migrations():
+                if migration_version <= schema_version:
+                    continue
+                migration(cursor)
+                cursor.execute(f"UPDATE wallet_manager SET schema_version = {self.param}", (migration_version,))
+                conn.commit()
+
+            if result is not None and result[0] != self.version:
+                cursor.execute(f"""
                     UPDATE wallet_manager
-                    SET version = %s
-                    WHERE version != %s
+                    SET version = {self.param}
+                    WHERE version != {self.param}
                 """, (self.version, self.version))
 
             conn.commit()
@@ -131,84 +872,1793 @@ class DatabaseManager:
             cursor.close()
             conn.close()
 
+    def migrations(self) -> list:
+        # Ordered (schema_version, migration) pairs; every migration must be safe to run twice
+        return [
+            (1, self.migrate_transaction_indexes),
+            (2, self.migrate_transaction_created_index),
+            (3, self.migrate_block_indexer),
+            (4, self.migrate_derivation_index),
+            (5, self.migrate_wallet_stats),
+        ]
+
+    def migrate_transaction_indexes(self, cursor):
+        self.create_index(cursor, 'transactions', 'idx_transactions_status', ['status'])
+        self.create_index(cursor, 'transactions', 'idx_transactions_tx_hash', ['tx_hash'])
+        self.create_index(cursor, 'transactions', 'idx_transactions_wallet_created', ['wallet_id', 'created_at'])
+
+    def migrate_transaction_created_index(self, cursor):
+        # Lets /transactions page through the whole history by (created_at, id)
+        self.create_index(cursor, 'transactions', 'idx_transactions_created', ['created_at'])
+
+    def migrate_block_indexer(self, cursor):
+        # Transfers found by the block indexer carry their direction and block
+        self.add_column(cursor, 'transactions', 'direction', "VARCHAR(3) NOT NULL DEFAULT 'OUT'")
+        self.add_column(cursor, 'transactions', 'block_number', "BIGINT NULL")
+        self.create_index(cursor, 'transactions', 'idx_transactions_block', ['block_number'])
+
+        # The most recent indexed blocks; the newest one is the checkpoint
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS indexer_blocks (
+                block_number BIGINT PRIMARY KEY,
+                block_hash VARCHAR(66)
+            )
+        """)
+
+    def column_exists(self, cursor, table: str, column: str) -> bool:
+        raise NotImplementedError
+
+    def migrate_derivation_index(self, cursor):
+        # Position of a batch-created wallet on its mnemonic's m/44'/60'/0'/0/i path
+        self.add_column(cursor, 'wallets', 'derivation_index', "INT NULL")
+
+    def migrate_wallet_stats(self, cursor):
+        # Running totals per wallet, kept in step with transactions by every writer
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS wallet_stats (
+                wallet_id INT PRIMARY KEY,
+                transaction_count INT NOT NULL DEFAULT 0,
+                pending_count INT NOT NULL DEFAULT 0,
+                success_count INT NOT NULL DEFAULT 0,
+                failed_count INT NOT NULL DEFAULT 0,
+                sent_count INT NOT NULL DEFAULT 0,
+                sent_amount DECIMAL(28,8) NOT NULL DEFAULT 0,
+                received_count INT NOT NULL DEFAULT 0,
+                received_amount DECIMAL(28,8) NOT NULL DEFAULT 0,
+                gas_spent DECIMAL(28,8) NOT NULL DEFAULT 0
+            )
+        """)
+        self.rebuild_wallet_stats(cursor)
+
+    def add_column(self, cursor, table: str, column: str, definition: str):
+        if not self.column_exists(cursor, table, column):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def index_exists(self, cursor, table: str, index: str) -> bool:
+        raise NotImplementedError
+
+    def create_index(self, cursor, table: str, index: str, columns: list[str]):
+        # MySQL has no CREATE INDEX IF NOT EXISTS
+        if not self.index_exists(cursor, table, index):
+            cursor.execute(f"CREATE INDEX {index} ON {table} ({', '.join(columns)})")
+
+    # Queries take the caller's cursor, so several can share one transaction; those returning rows need a dictionary cursor
+    def placeholders(self, count: int) -> str:
+        return ", ".join([self.param] * count)
+
+    def list_wallets(self, cursor) -> list[dict]:
+        cursor.execute("SELECT address, wallet_name, created_at FROM wallets")
+        return cursor.fetchall()
+
+    def list_wallet_ids(self, cursor) -> dict[str, int]:
+        # Lowercase address -> wallet id
+        cursor.execute("SELECT id, address FROM wallets")
+        return {wallet['address'].lower(): wallet['id'] for wallet in cursor.fetchall()}
+
+    def get_wallet(self, cursor, address: str) -> dict | None:
+        cursor.execute(f"SELECT * FROM wallets WHERE address = {self.param}", (address,))
+        return cursor.fetchone()
+
+    def get_wallets(self, cursor, addresses: list[str]) -> list[dict]:
+        cursor.execute(f"SELECT id, address, private_key FROM wallets WHERE address IN ({self.placeholders(len(addresses))})", addresses)
+        return cursor.fetchall()
+
+    def existing_addresses(self, cursor, addresses: list[str]) -> set[str]:
+        # The lowercase addresses among these that already have a wallet
+        cursor.execute(f"SELECT address FROM wallets WHERE address IN ({self.placeholders(len(addresses))})", addresses)
+        return {row['address'].lower() for row in cursor.fetchall()}
+
+    def insert_wallet(self, cursor, address: str, private_key: str, wallet_name: str) -> int:
+        cursor.execute(
+            f"INSERT INTO wallets (address, private_key, wallet_name) VALUES ({self.placeholders(3)})",
+            (address, private_key, wallet_name)
+        )
+        return cursor.lastrowid
+
+    def insert_derived_wallets(self, cursor, rows: list[tuple]):
+        # (address, private_key, wallet_name, derivation_index) rows
+        cursor.executemany(
+            f"INSERT INTO wallets (address, private_key, wallet_name, derivation_index) VALUES ({self.placeholders(4)})",
+            rows
+        )
+
+    def insert_new_wallets(self, cursor, rows: list[tuple]) -> int:
+        # (address, private_key, wallet_name) rows; skips wallets that already exist and returns how many were added
+        raise NotImplementedError
+
+    def delete_wallet(self, cursor, wallet_id: int):
+        cursor.execute(f"DELETE FROM transactions WHERE wallet_id = {self.param}", (wallet_id,))
+        cursor.execute(f"DELETE FROM wallet_stats WHERE wallet_id = {self.param}", (wallet_id,))
+        cursor.execute(f"DELETE FROM wallets WHERE id = {self.param}", (wallet_id,))
+
+    def insert_transactions(self, cursor, rows: list[tuple]):
+        # Sent transfers: (wallet_id, tx_hash, from_address, to_address, amount, status) rows
+        cursor.executemany(f"""
+            INSERT INTO transactions
+            (wallet_id, tx_hash, from_address, to_address, amount, status)
+            VALUES ({self.placeholders(6)})
+        """, rows)
+
+    def insert_indexed_transactions(self, cursor, rows: list[tuple]):
+        # Transfers found in blocks: (wallet_id, tx_hash, from_address, to_address, amount, gas_used, status,
+        # direction, block_number, created_at) rows
+        cursor.executemany(f"""
+            INSERT INTO transactions
+            (wallet_id, tx_hash, from_address, to_address, amount, gas_used, status, direction, block_number, created_at)
+            VALUES ({self.placeholders(10)})
+        """, rows)
+
+    def update_transaction_statuses(self, cursor, updates: list[tuple]):
+        # (status, gas_used, id) rows
+        cursor.executemany(f"""
+            UPDATE transactions
+            SET status = {self.param}, gas_used = {self.param}
+            WHERE id = {self.param}
+        """, updates)
+
+    def list_pending_transactions(self, cursor) -> list[dict]:
+        cursor.execute("SELECT id, wallet_id, tx_hash, from_address, to_address, amount, direction FROM transactions WHERE status = 'PENDING'")
+        return cursor.fetchall()
+
+    def list_transactions(self, cursor, wallet_id: int | None, after: tuple[datetime, int] | None, limit: int | None):
+        # Keyset pagination on (created_at, id), newest first; the rows are left on the cursor so they can be streamed
+        conditions = []
+        params = []
+        if wallet_id is not None:
+            conditions.append(f"t.wallet_id = {self.param}")
+            params.append(wallet_id)
+        if after is not None:
+            created_at, transaction_id = after
+            conditions.append(f"(t.created_at < {self.param} OR (t.created_at = {self.param} AND t.id < {self.param}))")
+            params += [created_at, created_at, transaction_id]
+
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions t"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY t.created_at DESC, t.id DESC"
+        if limit is not None:
+            query += f" LIMIT {self.param}"
+            params.append(limit)
+
+        cursor.execute(query, params)
+
+    def recorded_transactions(self, cursor, tx_hashes: list[str]) -> set[tuple[int, str]]:
+        # (wallet_id, tx_hash) of the given transactions that are already stored
+        cursor.execute(f"SELECT wallet_id, tx_hash FROM transactions WHERE tx_hash IN ({self.placeholders(len(tx_hashes))})", tx_hashes)
+        return {(row['wallet_id'], row['tx_hash']) for row in cursor.fetchall()}
+
+    def delete_transactions_after(self, cursor, block_number: int) -> list[int]:
+        # Removes transfers indexed above the block and returns the wallets they belonged to
+        cursor.execute(f"SELECT DISTINCT wallet_id FROM transactions WHERE block_number > {self.param}", (block_number,))
+        wallet_ids = [row['wallet_id'] for row in cursor.fetchall()]
+        cursor.execute(f"DELETE FROM transactions WHERE block_number > {self.param}", (block_number,))
+        return wallet_ids
+
+    def get_wallet_stats(self, cursor, address: str) -> dict | None:
+        cursor.execute(f"""
+            SELECT w.address, {', '.join(f's.{column}' for column in WALLET_STATS_COLUMNS)}
+            FROM wallets w
+            LEFT JOIN wallet_stats s ON s.wallet_id = w.id
+            WHERE w.address = {self.param}
+        """, (address,))
+        return cursor.fetchone()
+
+    def add_wallet_stats(self, cursor, changes: list[tuple[int, tuple]]):
+        # Add (wallet_id, delta) pairs to wallet_stats; call before the commit of the rows they describe
+        totals = {}
+        for wallet_id, delta in changes:
+            current = totals.get(wallet_id)
+            totals[wallet_id] = delta if current is None else tuple(a + b for a, b in zip(current, delta))
+        if totals:
+            self.increment_wallet_stats(cursor, [(wallet_id, *delta) for wallet_id, delta in sorted(totals.items())])
+
+    def increment_wallet_stats(self, cursor, rows: list[tuple]):
+        # (wallet_id, *WALLET_STATS_COLUMNS) rows, added to the wallet's existing totals
+        raise NotImplementedError
+
+    def rebuild_wallet_stats(self, cursor, wallet_ids: list[int] | None = None):
+        # Recompute totals from the transactions table, for every wallet or just the given ones
+        if wallet_ids is None:
+            condition, params = "", ()
+            cursor.execute("DELETE FROM wallet_stats")
+        elif not wallet_ids:
+            return
+        else:
+            condition = f"WHERE wallet_id IN ({self.placeholders(len(wallet_ids))})"
+            params = tuple(wallet_ids)
+            cursor.execute(f"DELETE FROM wallet_stats {condition}", params)
+
+        cursor.execute(f"""
+            INSERT INTO wallet_stats (wallet_id, {', '.join(WALLET_STATS_COLUMNS)})
+            SELECT
+                wallet_id,
+                COUNT(*),
+                SUM(CASE WHEN status = 'PENDING' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status = 'SUCCESS' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status = 'FAILED' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status = 'SUCCESS' AND direction = 'OUT' THEN 1 ELSE 0 END),
+                COALESCE(SUM(CASE WHEN status = 'SUCCESS' AND direction = 'OUT' THEN amount ELSE 0 END), 0),
+                SUM(CASE WHEN status = 'SUCCESS' AND direction = 'IN' THEN 1 ELSE 0 END),
+                COALESCE(SUM(CASE WHEN status = 'SUCCESS' AND direction = 'IN' THEN amount ELSE 0 END), 0),
+                COALESCE(SUM(gas_used), 0)
+            FROM transactions
+            {condition}
+            GROUP BY wallet_id
+        """, params)
+
+    def count_wallet_stats(self, cursor) -> int:
+        cursor.execute("SELECT COUNT(*) AS wallets FROM wallet_stats")
+        return cursor.fetchone()['wallets']
+
+    def recent_indexed_blocks(self, cursor, limit: int) -> list[dict]:
+        # Newest first; the first one is the indexer's checkpoint
+        cursor.execute(f"SELECT block_number, block_hash FROM indexer_blocks ORDER BY block_number DESC LIMIT {self.param}", (limit,))
+        return cursor.fetchall()
+
+    def add_indexed_blocks(self, cursor, blocks: list[tuple[int, str]]):
+        # (block_number, block_hash) rows
+        cursor.executemany(f"INSERT INTO indexer_blocks (block_number, block_hash) VALUES ({self.placeholders(2)})", blocks)
+
+    def delete_indexed_blocks(self, cursor, below: int | None = None, above: int | None = None):
+        # Forget blocks at or below `below` (too old to be reorged) or above `above` (orphaned)
+        if below is not None:
+            cursor.execute(f"DELETE FROM indexer_blocks WHERE block_number <= {self.param}", (below,))
+        if above is not None:
+            cursor.execute(f"DELETE FROM indexer_blocks WHERE block_number > {self.param}", (above,))
+
+
+# MySQL Database Manager Class
+class MySQLDatabaseManager(DatabaseManager):
+    Error = mysql.connector.Error
 
-# Ethereum Manager Class
-class EthereumManager:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(f"https://sepolia.infura.io/v3/{os.getenv('INFURA_API_KEY')}"))
+        super().__init__()
+        self.db_config = {
+            'host': os.getenv('DB_HOST'),
+            'user': os.getenv('DB_USER'),
+            'password': os.getenv('DB_PASSWORD'),
+            'database': os.getenv('DB_NAME'),
+            # CURRENT_TIMESTAMP defaults in UTC, like SQLite and the block timestamps the indexer stores
+            'time_zone': '+00:00'
+        }
+        self.pool = self.create_pool(
+            self.create_connection,
+            int(os.getenv('DB_POOL_SIZE', 10)),
+            int(os.getenv('DB_POOL_MAX_OVERFLOW', 5))
+        )
 
-    def send_transaction(self, from_address: str, to_address: str, amount: float, private_key: str):
+    def create_connection(self):
         try:
-            if not private_key.startswith('0x'):
-                private_key = '0x' + private_key
+            conn = mysql.connector.connect(**self.db_config)
+            return conn
+        except mysql.connector.Error as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-            nonce = self.w3.eth.get_transaction_count(from_address)
-            gas_price = self.w3.eth.gas_price
+    @contextmanager
+    def migration_lock(self):
+        # GET_LOCK belongs to this connection's session, so it is freed even if the worker dies
+        lock_name = f"{self.db_config['database']}.migrations"
+        conn = self.get_connection()
+        cursor = conn.cursor()
 
-            transaction = {
-                'nonce': nonce,
-                'to': self.w3.to_checksum_address(to_address),
-                'value': self.w3.to_wei(amount, 'ether'),
-                'gas': 21000,
-                'gasPrice': gas_price,
-                'chainId': int(os.getenv('CHAIN_ID'))
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (lock_name, float(os.getenv('MIGRATION_LOCK_TIMEOUT', 60))))
+            if cursor.fetchone()[0] != 1:
+                raise RuntimeError("Timed out waiting for the migration lock")
+            try:
+                yield
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+                cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def column_exists(self, cursor, table: str, column: str) -> bool:
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        return cursor.fetchone()[0] > 0
+
+    def index_exists(self, cursor, table: str, index: str) -> bool:
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """, (table, index))
+        return cursor.fetchone()[0] > 0
+
+    def insert_new_wallets(self, cursor, rows: list[tuple]) -> int:
+        cursor.executemany(f"INSERT IGNORE INTO wallets (address, private_key, wallet_name) VALUES ({self.placeholders(3)})", rows)
+        return max(cursor.rowcount, 0)
+
+    def increment_wallet_stats(self, cursor, rows: list[tuple]):
+        updates = ", ".join(f"{column} = {column} + VALUES({column})" for column in WALLET_STATS_COLUMNS)
+        cursor.executemany(f"""
+            INSERT INTO wallet_stats (wallet_id, {', '.join(WALLET_STATS_COLUMNS)})
+            VALUES ({self.placeholders(len(WALLET_STATS_COLUMNS) + 1)})
+            ON DUPLICATE KEY UPDATE {updates}
+        """, rows)
+
+
+def sqlite_dict_row(cursor, row) -> dict:
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+# SQLite Cursor Class
+class SQLiteCursor:
+    def __init__(self, cursor, dictionary: bool):
+        self._cursor = cursor
+        if dictionary:
+            cursor.row_factory = sqlite_dict_row
+
+    def execute(self, query, params=None):
+        self._cursor.execute(query, params or ())
+
+    def executemany(self, query, params):
+        self._cursor.executemany(query, params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size: int):
+        return self._cursor.fetchmany(size)
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self) -> int:
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+# SQLite Connection Class
+class SQLiteConnection:
+    # Gives sqlite3 the parts of the mysql.connector interface the endpoints use
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, dictionary: bool = False) -> SQLiteCursor:
+        return SQLiteCursor(self._conn.cursor(), dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self):
+        self._conn.close()
+
+
+# SQLite Database Manager Class
+class SQLiteDatabaseManager(DatabaseManager):
+    # Embedded database in WAL mode: one writer connection, a pool of read-only connections
+    id_column = "INTEGER PRIMARY KEY AUTOINCREMENT"
+    address_column = "VARCHAR(42) COLLATE NOCASE"  # Matches MySQL's case-insensitive address lookups
+    param = "?"
+    Error = sqlite3.Error
+
+    def __init__(self):
+        super().__init__()
+        self.path = os.getenv('SQLITE_PATH', 'wallet.db')
+        self.busy_timeout = float(os.getenv('SQLITE_BUSY_TIMEOUT', 5))
+        self.statement_cache = int(os.getenv('SQLITE_STATEMENT_CACHE', 256))
+
+        sqlite3.register_adapter(Decimal, str)
+        sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+        sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+        # SQLite keeps DECIMAL columns as floats; round back to the 8 places MySQL stores
+        sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()).quantize(Decimal('1e-8')))
+
+        self.pool = self.create_pool(lambda: self.create_connection(True), int(os.getenv('DB_POOL_SIZE', 10)), 0)
+        self.writer_pool = self.create_pool(lambda: self.create_connection(False), 1, 0)
+
+    def create_connection(self, readonly: bool):
+        try:
+            # sqlite3 keeps compiled statements per connection, so repeated queries skip the parser
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                check_same_thread=False,
+                cached_statements=self.statement_cache
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            if readonly:
+                conn.execute("PRAGMA query_only=ON")
+            return SQLiteConnection(conn)
+        except sqlite3.Error as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    def get_connection(self, readonly: bool = False) -> PooledConnection:
+        pool = self.pool if readonly else self.writer_pool
+        return PooledConnection(pool, pool.acquire())
+
+    def pools(self) -> dict[str, ConnectionPool]:
+        return {'db_pool': self.pool, 'db_writer': self.writer_pool}
+
+    @contextmanager
+    def migration_lock(self):
+        # SQLite has no advisory locks; a lock file next to the database does the same job
+        if fcntl is None:
+            yield
+            return
+
+        fd = os.open(f"{self.path}.migrate.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def column_exists(self, cursor, table: str, column: str) -> bool:
+        cursor.execute(f"PRAGMA table_info({table})")
+        return any(row[1] == column for row in cursor.fetchall())
+
+    def index_exists(self, cursor, table: str, index: str) -> bool:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name = ?", (index,))
+        return cursor.fetchone()[0] > 0
+
+    def insert_new_wallets(self, cursor, rows: list[tuple]) -> int:
+        cursor.executemany(f"INSERT OR IGNORE INTO wallets (address, private_key, wallet_name) VALUES ({self.placeholders(3)})", rows)
+        return max(cursor.rowcount, 0)
+
+    def increment_wallet_stats(self, cursor, rows: list[tuple]):
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in WALLET_STATS_COLUMNS)
+        cursor.executemany(f"""
+            INSERT INTO wallet_stats (wallet_id, {', '.join(WALLET_STATS_COLUMNS)})
+            VALUES ({self.placeholders(len(WALLET_STATS_COLUMNS) + 1)})
+            ON CONFLICT (wallet_id) DO UPDATE SET {updates}
+        """, rows)
+
+
+def create_database_manager() -> DatabaseManager:
+    backend = os.getenv('DB_BACKEND', 'mysql').lower()
+    if backend == 'sqlite':
+        return SQLiteDatabaseManager()
+    return MySQLDatabaseManager()
+
+
+# Wallet stats
+WALLET_STATS_COLUMNS = (
+    'transaction_count', 'pending_count', 'success_count', 'failed_count',
+    'sent_count', 'sent_amount', 'received_count', 'received_amount', 'gas_spent'
+)
+
+def transaction_stats(direction: str, status: str, amount, gas_used) -> tuple:
+    # What one transaction row contributes to its wallet's totals; amounts count once the transfer succeeded
+    success = status == 'SUCCESS'
+    amount = Decimal(str(amount or 0))
+    return (
+        1,
+        int(status == 'PENDING'),
+        int(success),
+        int(status == 'FAILED'),
+        int(success and direction == 'OUT'),
+        amount if success and direction == 'OUT' else Decimal(0),
+        int(success and direction == 'IN'),
+        amount if success and direction == 'IN' else Decimal(0),
+        Decimal(str(gas_used or 0))
+    )
+
+
+# LRU Cache Class
+class LRUCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_fresh(self, value) -> bool:
+        return True
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None or not self.is_fresh(value):
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
             }
 
+
+# Balance Cache Class
+class BalanceCache(LRUCache):
+    # Values are (balance, block_number, read_at) tuples keyed by lowercase address
+    def __init__(self, max_size: int, ttl: float):
+        super().__init__(max_size)
+        self.ttl = ttl
+        self.head_block = 0
+
+    def is_fresh(self, value) -> bool:
+        balance, block_number, read_at = value
+        return block_number >= self.head_block and time.monotonic() - read_at < self.ttl
+
+
+# Event Bus Class
+class Subscription:
+    def __init__(self, addresses: set[str]):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.addresses = {address.lower() for address in addresses}
+
+    def deliver(self, event: dict):
+        # A client that stops reading loses events instead of growing the queue
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+
+class EventBus:
+    # Hands events from worker threads to subscribers waiting on the event loop
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+
+    def subscribe(self, addresses: set[str]) -> Subscription:
+        subscription = Subscription(addresses)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def is_watched(self, address: str) -> bool:
+        address = address.lower()
+        with self.lock:
+            return any(address in subscription.addresses for subscription in self.subscriptions)
+
+    def publish(self, addresses: set[str], event: dict):
+        self.deliver(addresses, event)
+        share('event', addresses=[address for address in addresses if address], event=event)
+
+    def deliver(self, addresses: set[str], event: dict):
+        # Only reaches subscribers connected to this worker
+        addresses = {address.lower() for address in addresses if address}
+        with self.lock:
+            subscriptions = [s for s in self.subscriptions if s.addresses & addresses]
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+
+
+# Change Versions Class
+class ChangeVersions:
+    # In-memory change counters behind the listing ETags; the boot id keeps tags from an earlier run from matching.
+    # Wallets hash into a fixed number of slots, so counterparties that are not our wallets can't grow it.
+    def __init__(self, slots: int):
+        self.boot_id = os.urandom(4).hex()
+        self.lock = threading.Lock()
+        self.epoch = 0
+        self.version = 0
+        self.slots = slots
+        self.wallet_versions = [0] * slots
+
+    def slot(self, address: str) -> int:
+        return zlib.crc32(address.lower().encode()) % self.slots
+
+    def bump(self, addresses):
+        with self.lock:
+            self.version += 1
+            for address in addresses:
+                if address:
+                    self.wallet_versions[self.slot(address)] = self.version
+
+    def bump_all(self):
+        with self.lock:
+            self.epoch += 1
+            self.version += 1
+
+    def etag(self, address: str | None = None, *parts) -> str:
+        with self.lock:
+            version = self.version if address is None else self.wallet_versions[self.slot(address)]
+            return '"' + "-".join(str(part) for part in (self.boot_id, self.epoch, version, *parts)) + '"'
+
+
+# Shared Change Versions Class
+class SharedChangeVersions(ChangeVersions):
+    # The same counters in a memory-mapped file in the run directory, so every API worker hands out the same tags.
+    # Wallets hash into a fixed number of slots; two wallets sharing a slot only cost a spurious miss.
+    HEADER = struct.Struct('<QQQ')  # boot id, epoch, version
+    SLOT = struct.Struct('<Q')
+
+    def __init__(self, path: str, slots: int):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.slots = slots
+        size = self.HEADER.size + slots * self.SLOT.size
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        with self.locked():
+            # The first worker to start writes the boot id
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+                os.pwrite(self.fd, self.HEADER.pack(int.from_bytes(os.urandom(4), 'big'), 0, 0), 0)
+        self.map = mmap.mmap(self.fd, size)
+        self.boot_id = '%08x' % self.HEADER.unpack_from(self.map)[0]
+
+    @contextmanager
+    def locked(self):
+        # flock only keeps other processes out, so threads of this worker also take the thread lock
+        with self.lock:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def slot_offset(self, address: str) -> int:
+        return self.HEADER.size + self.slot(address) * self.SLOT.size
+
+    def bump(self, addresses):
+        with self.locked():
+            boot_id, epoch, version = self.HEADER.unpack_from(self.map)
+            version += 1
+            self.HEADER.pack_into(self.map, 0, boot_id, epoch, version)
+            for address in addresses:
+                if address:
+                    self.SLOT.pack_into(self.map, self.slot_offset(address), version)
+
+    def bump_all(self):
+        with self.locked():
+            boot_id, epoch, version = self.HEADER.unpack_from(self.map)
+            self.HEADER.pack_into(self.map, 0, boot_id, epoch + 1, version + 1)
+
+    def etag(self, address: str | None = None, *parts) -> str:
+        _, epoch, version = self.HEADER.unpack_from(self.map)
+        if address is not None:
+            version = self.SLOT.unpack_from(self.map, self.slot_offset(address))[0]
+        return '"' + "-".join(str(part) for part in (self.boot_id, epoch, version, *parts)) + '"'
+
+
+# Worker Channel Class
+class WorkerChannel:
+    # One Unix datagram socket per API worker in the run directory; a message goes to every other live worker
+    def __init__(self, run_dir: str, handlers: dict):
+        self.run_dir = run_dir
+        self.handlers = handlers
+        self.path = os.path.join(run_dir, f"worker-{os.getpid()}.sock")
+        self.socket = None
+        self.sender = None
+        self.thread = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='worker-channel-jobs')
+
+    def start(self):
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(self.path)
+        # A stuck worker must not hold up requests in the others
+        self.sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sender.settimeout(WORKER_SEND_TIMEOUT)
+        self.thread = threading.Thread(target=self.receive, name='worker-channel', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            # An empty datagram wakes the receiver up and ends it
+            self.sender.sendto(b'', self.path)
+            self.thread.join(timeout=5)
+            self.thread = None
+            self.socket.close()
+            self.sender.close()
+            os.unlink(self.path)
+            self.executor.shutdown(wait=True)
+
+    def receive(self):
+        while True:
+            data = self.socket.recv(WORKER_MESSAGE_BYTES)
+            if not data:
+                return
+            try:
+                message = json.loads(data)
+                self.handlers[message.pop('type')](**message)
+            except Exception as e:
+                print(f"Error handling worker message: {str(e)}")
+
+    def defer(self, handler, *args, **kwargs):
+        # For handlers that block; they run one at a time, in the order their messages arrived
+        def run():
+            try:
+                handler(*args, **kwargs)
+            except Exception as e:
+                print(f"Error handling worker message: {str(e)}")
+        self.executor.submit(run)
+
+    def publish(self, message_type: str, fields: dict):
+        if self.thread is None:
+            return
+
+        data = json.dumps({'type': message_type, **fields}).encode()
+        if len(data) > WORKER_MESSAGE_BYTES:
+            print(f"Error sending worker message: {message_type} message is {len(data)} bytes")
+            return
+        for name in os.listdir(self.run_dir):
+            path = os.path.join(self.run_dir, name)
+            if not name.startswith('worker-') or path == self.path:
+                continue
+            try:
+                self.sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker exited without cleaning up; later messages skip it
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except OSError as e:
+                print(f"Error sending worker message to {name}: {str(e)}")
+
+
+def share(message_type: str, **fields):
+    # Tell the other API workers about a change to in-memory state; nothing to do with a single worker
+    if worker_channel is not None:
+        worker_channel.publish(message_type, fields)
+
+
+# Nonce Manager Class
+class NonceManager:
+    # Hands out nonces locally so concurrent sends from one wallet never collide
+    def __init__(self, fetch_nonce):
+        self.fetch_nonce = fetch_nonce
+        self.lock = threading.Lock()
+        self.address_locks = {}
+        self.states = {}  # address -> {'next': next nonce, 'released': nonces to reuse}; empty until fetched
+
+    def address_lock(self, address: str) -> threading.Lock:
+        with self.lock:
+            return self.address_locks.setdefault(address, threading.Lock())
+
+    @contextmanager
+    def address_state(self, address: str):
+        # Changes made to the yielded state are kept
+        with self.address_lock(address):
+            yield self.states.setdefault(address, {})
+
+    def reserve(self, address: str) -> int:
+        address = address.lower()
+        with self.address_state(address) as state:
+            if not state:
+                state.update(next=self.fetch_nonce(address), released=set())
+
+            # Fill gaps left by failed sends before using a new nonce
+            if state['released']:
+                nonce = min(state['released'])
+                state['released'].remove(nonce)
+            else:
+                nonce = state['next']
+                state['next'] += 1
+            return nonce
+
+    def release(self, address: str, nonce: int):
+        # A nonce that never reached the node has to be reused, or every later transaction waits on it
+        address = address.lower()
+        with self.address_state(address) as state:
+            if not state or nonce >= state['next']:
+                return
+
+            state['released'].add(nonce)
+            while state['next'] - 1 in state['released']:
+                state['next'] -= 1
+                state['released'].remove(state['next'])
+
+    def resync(self, address: str):
+        # Forget the local state; the next reserve asks the node for the pending count again
+        address = address.lower()
+        with self.address_state(address) as state:
+            state.clear()
+
+
+# Shared Nonce Manager Class
+class SharedNonceManager(NonceManager):
+    # The same state in one file per address in the run directory. Each reserve holds the file's flock
+    # while it reads, updates and writes the state, so two API workers never hand out the same nonce.
+    def __init__(self, fetch_nonce, directory: str):
+        super().__init__(fetch_nonce)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def address_state(self, address: str):
+        # flock only keeps other processes out, so threads of this worker also take the address lock
+        with self.address_lock(address):
+            fd = os.open(os.path.join(self.directory, f"{address}.json"), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                stored = os.read(fd, 1 << 20)
+                state = json.loads(stored) if stored else {}
+                if state:
+                    state['released'] = set(state['released'])
+
+                yield state
+
+                data = json.dumps({'next': state['next'], 'released': sorted(state['released'])}).encode() if state else b''
+                os.ftruncate(fd, 0)
+                os.pwrite(fd, data, 0)
+            finally:
+                os.close(fd)  # Also drops the flock
+
+
+def rpc_error_message(error) -> str:
+    # Nodes and proxies don't all answer with a JSON-RPC error object; some send a string or null
+    if isinstance(error, dict):
+        return str(error.get('message', error))
+    return "Ethereum node returned no result" if error is None else str(error)
+
+def is_nonce_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(text in message for text in (
+        'nonce too low',
+        'nonce too high',
+        'invalid nonce',
+        'already known',
+        'replacement transaction underpriced'
+    ))
+
+
+# Ethereum Manager Class
+class EthereumManager:
+    def __init__(self):
+        self.web3 = None
+        self.web3_lock = threading.Lock()
+        self.batch_size = int(os.getenv('RPC_BATCH_SIZE', 100))
+        self.balance_cache = BalanceCache(
+            int(os.getenv('BALANCE_CACHE_SIZE', 10000)),
+            float(os.getenv('BALANCE_CACHE_TTL', 30))
+        )
+        self.block_poll_interval = float(os.getenv('BLOCK_POLL_INTERVAL', 4))
+        self.head_checked_at = None
+        self.nonce_manager = NonceManager(self.get_pending_nonce)
+        self.event_bus = EventBus()
+        self.signer_cache = LRUCache(int(os.getenv('SIGNER_CACHE_SIZE', 1000)))
+        self.change_versions = ChangeVersions(int(os.getenv('ETAG_SLOTS', 65536)))
+        self.fee_oracle = FeeOracle(self)
+
+    @property
+    def w3(self):
+        # Importing web3 takes most of a second, so the client is built on first use rather than at startup
+        if self.web3 is None:
+            with self.web3_lock:
+                if self.web3 is None:
+                    from web3 import Web3
+                    rpc_urls = os.getenv('ETH_RPC_URLS') or os.getenv('ETH_RPC_URL') or f"https://sepolia.infura.io/v3/{os.getenv('INFURA_API_KEY')}"
+                    self.web3 = Web3(RPCProviderPool.create(
+                        [url.strip() for url in rpc_urls.split(',') if url.strip()],
+                        float(os.getenv('RPC_HEDGE_DELAY', 0.3)),
+                        float(os.getenv('RPC_UNHEALTHY_COOLDOWN', 5)),
+                        float(os.getenv('RPC_TIMEOUT', 10))
+                    ))
+        return self.web3
+
+    def warm_up(self):
+        # Runs in a background thread at startup so the first requests don't pay for the imports
+        self.w3
+        load_account()
+
+    def get_head(self) -> int:
+        # Ask the node for the newest block at most once per block_poll_interval
+        if self.head_checked_at is None or time.monotonic() - self.head_checked_at >= self.block_poll_interval:
+            self.set_head(self.w3.eth.block_number)
+        return self.balance_cache.head_block
+
+    def set_head(self, block_number: int, notify: bool = True):
+        # A new head expires every cached balance read at an older block
+        advanced = block_number > self.balance_cache.head_block
+        self.balance_cache.head_block = max(self.balance_cache.head_block, block_number)
+        self.head_checked_at = time.monotonic()
+        if advanced and notify:
+            share('head', block_number=block_number)
+
+    def batch_call(self, method: str, params_list: list, partial: bool = False) -> list:
+        # Send one JSON-RPC method for many parameter sets, batch_size calls per HTTP request.
+        # With partial, a failed HTTP request doesn't raise: its calls and every later one get an error
+        # response marked 'failed', and the responses already received are kept.
+        responses = []
+        for start in range(0, len(params_list), self.batch_size):
+            chunk = params_list[start:start + self.batch_size]
+            try:
+                batch_response = self.w3.provider.make_batch_request([(method, params) for params in chunk])
+            except Exception as e:
+                if not partial:
+                    raise
+                responses.extend([{'error': {'message': f"Ethereum node error: {str(e)}"}, 'failed': True}] * len(chunk))
+                unsent = len(params_list) - start - len(chunk)
+                responses.extend([{'error': {'message': "Not sent: an earlier JSON-RPC batch failed"}, 'failed': True}] * unsent)
+                break
+
+            # The node answers a rejected batch with a single error object; apply it to every call
+            if not isinstance(batch_response, list):
+                error = batch_response.get('error') if isinstance(batch_response, dict) else batch_response
+                batch_response = [{'error': error}] * len(chunk)
+
+            responses.extend(batch_response)
+        return responses
+
+    def get_balances(self, addresses: list[str]) -> dict[str, int]:
+        head_block = self.get_head()
+
+        balances = {}
+        missing = []
+        for address in addresses:
+            cached = self.balance_cache.get(address.lower())
+            if cached is not None:
+                balances[address] = cached[0]
+            else:
+                missing.append(address)
+
+        if not missing:
+            return balances
+
+        responses = self.batch_call('eth_getBalance', [[address, 'latest'] for address in missing])
+
+        read_at = time.monotonic()
+        for address, response in zip(missing, responses):
+            if 'error' in response:
+                raise HTTPException(status_code=502, detail=f"Error fetching balance for {address}: {response['error']}")
+            balances[address] = int(response['result'], 16)
+            self.balance_cache.put(address.lower(), (balances[address], head_block, read_at))
+        return balances
+
+    def invalidate_balance(self, address: str, notify: bool = True):
+        self.balance_cache.invalidate(address.lower())
+        self.change_versions.bump([address])
+        if notify:
+            share('balance', address=address)
+
+    def notify_balances(self, addresses: list[str], notify: bool = True):
+        # Every worker pushes fresh balances to its own subscribers of the changed addresses
+        # A finished batch repeats the sending wallet for every transfer
+        unique = {}
+        for address in addresses:
+            if address:
+                unique.setdefault(address.lower(), address)
+        addresses = list(unique.values())
+        if notify:
+            for start in range(0, len(addresses), WORKER_MESSAGE_ADDRESSES):
+                share('balances', addresses=addresses[start:start + WORKER_MESSAGE_ADDRESSES])
+        watched = sorted(address for address in addresses if self.event_bus.is_watched(address))
+        if not watched:
+            return
+
+        for address in watched:
+            self.invalidate_balance(address, notify)
+        balances = self.get_balances(watched)
+
+        for address, balance in balances.items():
+            self.event_bus.deliver({address}, {
+                'type': 'balance',
+                'address': address,
+                'balance': float(self.w3.from_wei(balance, 'ether'))
+            })
+
+    def get_pending_nonce(self, address: str) -> int:
+        return self.w3.eth.get_transaction_count(self.w3.to_checksum_address(address), 'pending')
+
+    def build_transaction(self, nonce: int, to_address: str, amount: float, urgency: str) -> dict:
+        max_fee, priority_fee = self.fee_oracle.get_fees(urgency)
+        return {
+            'type': 2,
+            'nonce': nonce,
+            'to': self.w3.to_checksum_address(to_address),
+            'value': self.w3.to_wei(amount, 'ether'),
+            'gas': 21000,
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': priority_fee,
+            'chainId': int(os.getenv('CHAIN_ID'))
+        }
+
+    def get_signer(self, address: str, private_key: str):
+        if not private_key.startswith('0x'):
+            private_key = '0x' + private_key
+
+        # Account.from_key derives the public key, so ready signers are kept per wallet
+        signer = self.signer_cache.get(address.lower())
+        if signer is None or bytes(signer.key) != bytes.fromhex(private_key[2:]):
+            signer = load_account().from_key(private_key)
+            if signer.address.lower() != address.lower():
+                raise ValueError("Private key does not belong to the sending wallet")
+            self.signer_cache.put(address.lower(), signer)
+        return signer
+
+    def send_transaction(self, from_address: str, to_address: str, amount: float, private_key: str, urgency: str = "normal"):
+        nonce = None
+        try:
+            signer = self.get_signer(from_address, private_key)
+
+            nonce = self.nonce_manager.reserve(from_address)
+            transaction = self.build_transaction(nonce, to_address, amount, urgency)
+
             # Sign the transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key)
+            signed_txn = signer.sign_transaction(transaction)
 
             # Send the transaction
             tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
             return self.w3.to_hex(tx_hash)
 
         except Exception as e:
+            if nonce is not None:
+                self.handle_send_error(from_address, nonce, e)
             raise HTTPException(status_code=400, detail=str(e))
 
-    def refresh_transactions(self, conn, cursor) -> int:
+    def send_transactions(self, transfers: list, private_keys: list[str]) -> list[tuple[str | None, str | None]]:
+        # Returns a (tx_hash, error) pair for every transfer, in order
+        results = [(None, None)] * len(transfers)
+
+        # Sign everything first; nonces are handed out in order per sender
+        signed = []
+        for index, (transfer, private_key) in enumerate(zip(transfers, private_keys)):
+            nonce = None
+            try:
+                signer = self.get_signer(transfer.from_address, private_key)
+
+                nonce = self.nonce_manager.reserve(transfer.from_address)
+                transaction = self.build_transaction(nonce, transfer.to_address, transfer.amount, transfer.urgency)
+                signed_txn = signer.sign_transaction(transaction)
+                signed.append((index, nonce, self.w3.to_hex(signed_txn.raw_transaction)))
+            except Exception as e:
+                if nonce is not None:
+                    self.nonce_manager.release(transfer.from_address, nonce)
+                results[index] = (None, str(e))
+
+        # Submit the raw transactions in JSON-RPC batches; chunks accepted before a failed one are still reported
+        responses = self.batch_call('eth_sendRawTransaction', [[raw_transaction] for _, _, raw_transaction in signed], partial=True)
+
+        for (index, nonce, _), response in zip(signed, responses):
+            if response.get('error') is not None or not response.get('result'):
+                error = rpc_error_message(response.get('error'))
+                if response.get('failed'):
+                    # The failed request may have reached the node, so the sender's nonce comes from the node again
+                    self.nonce_manager.resync(transfers[index].from_address)
+                else:
+                    self.handle_send_error(transfers[index].from_address, nonce, ValueError(error))
+                results[index] = (None, error)
+            else:
+                results[index] = (response['result'], None)
+
+        return results
+
+    def handle_send_error(self, from_address: str, nonce: int, error: Exception):
+        if is_nonce_error(error):
+            self.nonce_manager.resync(from_address)
+        else:
+            self.nonce_manager.release(from_address, nonce)
+
+    def get_receipts(self, tx_hashes: list[str]) -> dict:
+        responses = self.batch_call('eth_getTransactionReceipt', [[tx_hash] for tx_hash in tx_hashes])
+
+        receipts = {}
+        for tx_hash, response in zip(tx_hashes, responses):
+            if 'error' in response:
+                print(f"Error fetching receipt {tx_hash}: {response['error']}")
+                continue
+            if response.get('result') is not None:
+                receipts[tx_hash] = response['result']
+        return receipts
+
+    def get_blocks(self, block_numbers: list[int], full_transactions: bool) -> list[dict]:
+        responses = self.batch_call('eth_getBlockByNumber', [[hex(number), full_transactions] for number in block_numbers])
+
+        blocks = []
+        for number, response in zip(block_numbers, responses):
+            if 'error' in response or response.get('result') is None:
+                raise ValueError(f"Block {number} unavailable: {response.get('error')}")
+            blocks.append(response['result'])
+        return blocks
+
+    def refresh_transactions(self, db_manager, pending_transactions: list[dict] | None = None) -> int:
+        started = time.perf_counter()
         try:
-            # Get all PENDING transactions
-            cursor.execute("SELECT id, tx_hash FROM transactions WHERE status = 'PENDING'")
-            pending_transactions = cursor.fetchall()
+            # Get all PENDING transactions unless the caller already picked them
+            if pending_transactions is None:
+                pending_transactions = get_pending_transactions(db_manager)
+                metrics.pending_transactions.set(len(pending_transactions))
 
-            updated_count = 0
+            if not pending_transactions:
+                metrics.observe_refresh(time.perf_counter() - started)
+                return 0
+
+            # Get all receipts from the blockchain in batched requests
+            receipts = self.get_receipts([tx['tx_hash'] for tx in pending_transactions])
+
+            updates = []
+            finished = []
             for tx in pending_transactions:
+                tx_receipt = receipts.get(tx['tx_hash'])
+                if tx_receipt is None:
+                    continue  # Transaction is still PENDING
+
+                # Calculate the actual gas consumption in ETH; only the sender pays it
+                gas_used = float(self.w3.from_wei(
+                    int(tx_receipt['gasUsed'], 16) * int(tx_receipt['effectiveGasPrice'], 16),
+                    'ether'
+                )) if tx.get('direction', 'OUT') == 'OUT' else 0.0
+
+                # Determine the status
+                status = "SUCCESS" if int(tx_receipt['status'], 16) == 1 else "FAILED"
+
+                updates.append((status, gas_used, tx['id']))
+                finished.append((tx, status, gas_used))
+
+            # Update all finished transactions in the database at once; the write connection is only taken now
+            if updates:
+                conn = db_manager.get_connection()
+                cursor = conn.cursor()
                 try:
-                    # Get the transaction from the blockchain
-                    tx_receipt = self.w3.eth.get_transaction_receipt(tx['tx_hash'])
+                    db_manager.update_transaction_statuses(cursor, updates)
+
+                    # Move each finished transaction from pending to its final status in wallet_stats
+                    stats_changes = []
+                    for tx, status, gas_used in finished:
+                        direction = tx.get('direction', 'OUT')
+                        before = transaction_stats(direction, 'PENDING', tx['amount'], 0)
+                        after = transaction_stats(direction, status, tx['amount'], gas_used)
+                        stats_changes.append((tx['wallet_id'], tuple(a - b for a, b in zip(after, before))))
+                    db_manager.add_wallet_stats(cursor, stats_changes)
+                    conn.commit()
+                finally:
+                    cursor.close()
+                    conn.close()
+                self.change_versions.bump([address for tx, _, _ in finished for address in (tx['from_address'], tx['to_address'])])
+
+            for tx, status, gas_used in finished:
+                self.event_bus.publish({tx['from_address'], tx['to_address']}, {
+                    'type': 'transaction',
+                    'tx_hash': tx['tx_hash'],
+                    'from_address': tx['from_address'],
+                    'to_address': tx['to_address'],
+                    'status': status,
+                    'gas_used': gas_used
+                })
+            self.notify_balances([address for tx, _, _ in finished for address in (tx['from_address'], tx['to_address'])])
+
+            metrics.observe_refresh(time.perf_counter() - started)
+            return len(updates)
 
-                    if tx_receipt is None:
-                        continue  # Transaction is still PENDING
+        except Exception as e:
+            print(f"Error updating transactions: {str(e)}")
+            return 0
 
-                    # Calculate the actual gas consumption in ETH
-                    gas_used = float(self.w3.from_wei(tx_receipt.gasUsed * tx_receipt.effectiveGasPrice, 'ether'))
 
-                    # Determine the status
-                    status = "SUCCESS" if tx_receipt.status == 1 else "FAILED"
+def get_pending_transactions(db_manager) -> list[dict]:
+    conn = db_manager.get_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
 
-                    # Update the transaction in the database
-                    cursor.execute("""
-                        UPDATE transactions
-                        SET status = %s, gas_used = %s
-                        WHERE id = %s
-                    """, (status, gas_used, tx['id']))
+    try:
+        return db_manager.list_pending_transactions(cursor)
+    finally:
+        cursor.close()
+        conn.close()
 
-                    updated_count += 1
 
-                except Exception as e:
-                    print(f"Error updating transaction {tx['tx_hash']}: {str(e)}")
+# Background Worker Class
+class BackgroundWorker:
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in {self.name}: {str(e)}")
+            self.stop_event.wait(self.interval)
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 5)
+            self.thread = None
+
+
+# Fee Oracle Class
+class FeeOracle(BackgroundWorker):
+    # Samples eth_feeHistory in the background so sends can price EIP-1559 fees without an RPC call
+    URGENCY_PERCENTILES = {'slow': 10, 'normal': 50, 'fast': 90}
+
+    def __init__(self, eth_manager: 'EthereumManager'):
+        super().__init__('fee-oracle', float(os.getenv('FEE_ORACLE_INTERVAL', 12)))
+        self.eth_manager = eth_manager
+        self.history_blocks = int(os.getenv('FEE_HISTORY_BLOCKS', 20))
+        self.base_fee_multiplier = float(os.getenv('FEE_BASE_FEE_MULTIPLIER', 2))
+        # An older sample could price sends below the current base fee, so sends sample again themselves
+        self.max_age = float(os.getenv('FEE_MAX_AGE', self.interval * 5))
+        self.sample_lock = threading.Lock()
+        # urgency -> (max_fee_per_gas, max_priority_fee_per_gas), replaced as a whole on every sample
+        self.fees = None
+        self.base_fee = None
+        self.sampled_at = None
+
+    def run_once(self):
+        self.sample()
+
+    def sample(self):
+        percentiles = sorted(self.URGENCY_PERCENTILES.values())
+        history = self.eth_manager.w3.eth.fee_history(self.history_blocks, 'latest', percentiles)
+
+        # The last base fee is the one the next block will charge
+        base_fee = history['baseFeePerGas'][-1]
+        # Empty blocks report zero rewards, which says nothing about the going tip
+        rewards = [
+            reward for reward, ratio in zip(history.get('reward') or [], history['gasUsedRatio']) if ratio > 0
+        ]
+        fallback_priority_fee = None if rewards else self.eth_manager.w3.eth.max_priority_fee
+
+        fees = {}
+        for urgency, percentile in self.URGENCY_PERCENTILES.items():
+            if rewards:
+                column = percentiles.index(percentile)
+                priority_fee = int(statistics.median(reward[column] for reward in rewards))
+            else:
+                priority_fee = fallback_priority_fee
+            # Headroom lets the transaction stay valid while the base fee rises for a few blocks
+            fees[urgency] = (int(base_fee * self.base_fee_multiplier) + priority_fee, priority_fee)
+
+        self.fees, self.base_fee, self.sampled_at = fees, base_fee, time.monotonic()
+
+    def is_fresh(self) -> bool:
+        return self.fees is not None and time.monotonic() - self.sampled_at <= self.max_age
+
+    def get_fees(self, urgency: str) -> tuple[int, int]:
+        # Sends only wait for the node before the first sample, or when background sampling keeps failing
+        if not self.is_fresh():
+            with self.sample_lock:
+                if not self.is_fresh():
+                    if self.fees is not None:
+                        print(f"Fee sample is {time.monotonic() - self.sampled_at:.0f}s old, sampling before the send")
+                    self.sample()
+        return self.fees[urgency]
+
+    def stats(self) -> dict:
+        fees, sampled_at = self.fees, self.sampled_at
+        if fees is None:
+            return {'sampled': False}
+        return {
+            'sampled': True,
+            'age': round(time.monotonic() - sampled_at, 3),
+            'max_age': self.max_age,
+            'base_fee_gwei': float(self.eth_manager.w3.from_wei(self.base_fee, 'gwei')),
+            **{
+                urgency: {
+                    'max_fee_gwei': float(self.eth_manager.w3.from_wei(max_fee, 'gwei')),
+                    'max_priority_fee_gwei': float(self.eth_manager.w3.from_wei(priority_fee, 'gwei'))
+                }
+                for urgency, (max_fee, priority_fee) in fees.items()
+            }
+        }
+
+
+# Slow Request Profiler Class
+class SlowRequestProfiler(BackgroundWorker):
+    # Samples the stacks of threads running sync endpoints; requests slower than the threshold are
+    # written to a directory that keeps the newest `keep` profiles
+    def __init__(self, directory: str, threshold: float, interval: float, keep: int):
+        super().__init__('request-profiler', interval)
+        self.directory = directory
+        self.threshold = threshold
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.active = {}  # thread id -> RequestTimings
+        self.pending = queue.Queue(maxsize=100)
+        self.wake = threading.Event()  # Set while there are requests to sample or profiles to write
+        self.captured = 0
+        self.dropped = 0
+        # Every endpoint wrapper shares this code object; frames above it belong to the thread pool
+        self.stop_code = timed_endpoint(lambda: None).__code__
+
+    def track(self, timings: RequestTimings):
+        with self.lock:
+            timings.samples = {}
+            self.active[threading.get_ident()] = timings
+            self.wake.set()
+
+    def untrack(self):
+        with self.lock:
+            self.active.pop(threading.get_ident(), None)
+
+    def fold(self, frame) -> str:
+        stack = []
+        while frame is not None and frame.f_code is not self.stop_code:
+            stack.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+
+    def run_once(self):
+        with self.lock:
+            active = list(self.active.items())
+        if active:
+            frames = sys._current_frames()
+            folded = [(thread_id, timings, self.fold(frames[thread_id])) for thread_id, timings in active if thread_id in frames]
+            with self.lock:
+                for thread_id, timings, stack in folded:
+                    if self.active.get(thread_id) is timings:
+                        timings.samples[stack] = timings.samples.get(stack, 0) + 1
+        self.write_pending()
+
+        # Sleep until the next request instead of waking every interval while the server is idle
+        with self.lock:
+            if not self.active and self.pending.empty():
+                self.wake.clear()
+        self.wake.wait()
+
+    def finish(self, timings: RequestTimings, scope: dict, route: str, status: int | None, elapsed: float):
+        # Runs on the event loop, so the file is written by the sampler thread
+        if elapsed < self.threshold:
+            return
+        with self.lock:
+            stacks = dict(timings.samples)
+        record = {
+            'time': datetime.now().isoformat(),
+            'pid': os.getpid(),
+            'method': scope['method'],
+            'path': scope['path'],
+            'query': scope['query_string'].decode('latin-1'),
+            'route': route,
+            'status': status,
+            'duration_ms': round(elapsed * 1000, 3),
+            'spans': timings.as_dict(),
+            'sample_interval_ms': self.interval * 1000,
+            'samples': sum(stacks.values()),
+            'stacks': stacks
+        }
+        with self.lock:
+            try:
+                self.pending.put_nowait(record)
+                self.wake.set()
+            except queue.Full:
+                self.dropped += 1
+
+    def write_pending(self):
+        while True:
+            try:
+                record = self.pending.get_nowait()
+            except queue.Empty:
+                return
+            self.write(record)
+
+    def write(self, record: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        self.captured += 1
+        # Names sort by time, so rotation removes the oldest profiles of every worker
+        stamp = datetime.fromisoformat(record['time']).strftime('%Y%m%dT%H%M%S%f')
+        path = os.path.join(self.directory, f"{stamp}-{record['pid']}-{self.captured}.json")
+        with open(f"{path}.tmp", 'w') as profile:
+            json.dump(record, profile, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+        profiles = sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+        for name in profiles[:-self.keep]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass  # Another worker rotated it first
+
+    def stop(self):
+        # stop_event first, so the woken sampler exits instead of going back to sleep
+        self.stop_event.set()
+        self.wake.set()
+        super().stop()
+        self.write_pending()
+
+    def stats(self) -> dict:
+        return {
+            'threshold_ms': self.threshold * 1000,
+            'directory': self.directory,
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'active': len(self.active)
+        }
+
+
+# Receipt Tracker Class
+class ReceiptTracker(BackgroundWorker):
+    def __init__(self, db_manager: DatabaseManager, eth_manager: EthereumManager):
+        super().__init__('receipt-tracker', float(os.getenv('RECEIPT_POLL_INTERVAL', 5)))
+        self.db_manager = db_manager
+        self.eth_manager = eth_manager
+        self.backoff_after = int(os.getenv('RECEIPT_BACKOFF_AFTER', 12))
+        self.max_backoff = float(os.getenv('RECEIPT_MAX_BACKOFF', 300))
+        # tx_hash -> (attempts, next_check)
+        self.schedule = {}
+
+    def backoff(self, attempts: int) -> float:
+        # Poll at the base interval first, then back off exponentially for stuck transactions
+        if attempts <= self.backoff_after:
+            return self.interval
+        return min(self.interval * 2 ** (attempts - self.backoff_after), self.max_backoff)
+
+    def run_once(self):
+        pending_transactions = get_pending_transactions(self.db_manager)
+        metrics.pending_transactions.set(len(pending_transactions))
+
+        # Forget transactions that are no longer pending
+        pending_hashes = {tx['tx_hash'] for tx in pending_transactions}
+        self.schedule = {
+            tx_hash: entry for tx_hash, entry in self.schedule.items() if tx_hash in pending_hashes
+        }
+
+        now = time.monotonic()
+        due = [tx for tx in pending_transactions if self.schedule.get(tx['tx_hash'], (0, 0))[1] <= now]
+
+        self.eth_manager.refresh_transactions(self.db_manager, due)
+
+        for tx in due:
+            attempts = self.schedule.get(tx['tx_hash'], (0, 0))[0] + 1
+            self.schedule[tx['tx_hash']] = (attempts, now + self.backoff(attempts))
+
+# Block Indexer Class
+class BlockIndexer(BackgroundWorker):
+    # Walks every new block once and records transfers touching any of our wallets
+    def __init__(self, db_manager: DatabaseManager, eth_manager: EthereumManager):
+        super().__init__('block-indexer', float(os.getenv('INDEXER_POLL_INTERVAL', 4)))
+        self.db_manager = db_manager
+        self.eth_manager = eth_manager
+        self.reorg_depth = int(os.getenv('INDEXER_REORG_DEPTH', 12))
+        self.max_blocks = int(os.getenv('INDEXER_MAX_BLOCKS', 50))
+        self.start_block = os.getenv('INDEXER_START_BLOCK')
+        self.lock = threading.Lock()
+        # Lowercase address -> wallet id
+        self.wallet_ids = {}
+
+    def load_addresses(self, notify: bool = True):
+        conn = self.db_manager.get_connection(readonly=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            wallet_ids = self.db_manager.list_wallet_ids(cursor)
+            with self.lock:
+                self.wallet_ids = wallet_ids
+        finally:
+            cursor.close()
+            conn.close()
+
+        if notify:
+            share('wallets_reloaded')
+
+    def add_address(self, address: str, wallet_id: int, notify: bool = True):
+        with self.lock:
+            self.wallet_ids[address.lower()] = wallet_id
+        if notify:
+            share('wallet_added', address=address, wallet_id=wallet_id)
+
+    def remove_address(self, address: str, notify: bool = True):
+        with self.lock:
+            self.wallet_ids.pop(address.lower(), None)
+        if notify:
+            share('wallet_removed', address=address)
+
+    def run_once(self):
+        head = self.eth_manager.w3.eth.block_number
+        self.eth_manager.set_head(head)
+
+        conn = self.db_manager.get_connection(readonly=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            recent_blocks = self.db_manager.recent_indexed_blocks(cursor, self.reorg_depth)
+        finally:
+            cursor.close()
+            conn.close()
+
+        if recent_blocks:
+            first_block = recent_blocks[0]['block_number'] + 1
+        else:
+            first_block = int(self.start_block) if self.start_block else head
+
+        if first_block > head:
+            return
+
+        last_block = min(head, first_block + self.max_blocks - 1)
+        blocks = self.eth_manager.get_blocks(list(range(first_block, last_block + 1)), True)
+
+        # The chain we indexed no longer leads to the new blocks
+        if recent_blocks and blocks[0]['parentHash'] != recent_blocks[0]['block_hash']:
+            self.rollback_reorg(recent_blocks)
+            return
+
+        # Only index a continuous chain; a reorg in the middle is picked up next round
+        for index in range(1, len(blocks)):
+            if blocks[index]['parentHash'] != blocks[index - 1]['hash']:
+                blocks = blocks[:index]
+                break
+
+        self.index_blocks(blocks)
+
+    def index_blocks(self, blocks: list[dict]):
+        with self.lock:
+            wallet_ids = dict(self.wallet_ids)
+
+        # (wallet_id, direction, tx, block) for every transfer touching one of our wallets
+        matches = []
+        for block in blocks:
+            for tx in block['transactions']:
+                from_address = tx['from'].lower()
+                to_address = (tx.get('to') or '').lower()
+                if from_address in wallet_ids:
+                    matches.append((wallet_ids[from_address], 'OUT', tx, block))
+                if to_address in wallet_ids:
+                    matches.append((wallet_ids[to_address], 'IN', tx, block))
+
+        # Fetch receipts before taking the write connection
+        tx_hashes = sorted({tx['hash'] for _, _, tx, _ in matches})
+        receipts = self.eth_manager.get_receipts(tx_hashes) if tx_hashes else {}
+
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            rows = []
+            # Sends made through /wallet/send are already recorded
+            recorded = self.db_manager.recorded_transactions(cursor, tx_hashes) if matches else set()
+
+            for wallet_id, direction, tx, block in matches:
+                if (wallet_id, tx['hash']) in recorded:
                     continue
 
+                receipt = receipts.get(tx['hash'])
+                if receipt is None:
+                    status, gas_used = 'PENDING', None
+                else:
+                    status = "SUCCESS" if int(receipt['status'], 16) == 1 else "FAILED"
+                    gas_used = float(self.eth_manager.w3.from_wei(
+                        int(receipt['gasUsed'], 16) * int(receipt['effectiveGasPrice'], 16),
+                        'ether'
+                    )) if direction == 'OUT' else 0.0
+
+                rows.append((
+                    wallet_id,
+                    tx['hash'],
+                    self.eth_manager.w3.to_checksum_address(tx['from']),
+                    self.eth_manager.w3.to_checksum_address(tx['to']) if tx.get('to') else None,
+                    float(self.eth_manager.w3.from_wei(int(tx['value'], 16), 'ether')),
+                    gas_used,
+                    status,
+                    direction,
+                    int(block['number'], 16),
+                    # Naive UTC, matching the CURRENT_TIMESTAMP default of locally sent transactions
+                    datetime.fromtimestamp(int(block['timestamp'], 16), timezone.utc).replace(tzinfo=None)
+                ))
+
+            if rows:
+                self.db_manager.insert_indexed_transactions(cursor, rows)
+                self.db_manager.add_wallet_stats(cursor, [(row[0], transaction_stats(row[7], row[6], row[4], row[5])) for row in rows])
+
+            # Move the checkpoint in the same transaction as the inserts
+            self.db_manager.add_indexed_blocks(cursor, [(int(block['number'], 16), block['hash']) for block in blocks])
+            self.db_manager.delete_indexed_blocks(cursor, below=int(blocks[-1]['number'], 16) - self.reorg_depth)
             conn.commit()
-            return updated_count
+        finally:
+            cursor.close()
+            conn.close()
+
+        for row in rows:
+            self.eth_manager.invalidate_balance(row[2])
+            if row[3]:
+                self.eth_manager.invalidate_balance(row[3])
+            self.eth_manager.event_bus.publish({row[2], row[3]}, {
+                'type': 'transaction',
+                'tx_hash': row[1],
+                'from_address': row[2],
+                'to_address': row[3],
+                'amount': row[4],
+                'status': row[6],
+                'gas_used': row[5],
+                'direction': row[7]
+            })
+        self.eth_manager.notify_balances([address for row in rows for address in (row[2], row[3])])
+
+    def rollback_reorg(self, recent_blocks: list[dict]):
+        # Find the newest indexed block that is still part of the canonical chain
+        numbers = [block['block_number'] for block in recent_blocks]
+        canonical = self.eth_manager.get_blocks(numbers, False)
+
+        common_block = None
+        for stored, current in zip(recent_blocks, canonical):
+            if stored['block_hash'] == current['hash']:
+                common_block = stored['block_number']
+                break
+
+        checkpoint = None
+        if common_block is None:
+            # Deeper than INDEXER_REORG_DEPTH; start again below the oldest block we still know
+            common_block = numbers[-1] - 1
+            checkpoint = (common_block, self.eth_manager.get_blocks([common_block], False)[0]['hash'])
+            print(f"Reorg deeper than {self.reorg_depth} blocks, re-indexing from block {common_block + 1}")
+
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            affected_wallets = self.db_manager.delete_transactions_after(cursor, common_block)
+            self.db_manager.rebuild_wallet_stats(cursor, affected_wallets)
+            self.db_manager.delete_indexed_blocks(cursor, above=common_block)
+            if checkpoint is not None:
+                self.db_manager.add_indexed_blocks(cursor, [checkpoint])
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        self.eth_manager.change_versions.bump_all()
+
+
+# Worker Coordinator Class
+class WorkerCoordinator(BackgroundWorker):
+    # Runs in every API worker when API_WORKERS > 1. The worker holding the leader lock file runs the
+    # receipt tracker and block indexer; the lock is freed when it exits and another worker takes over.
+    def __init__(self, run_dir: str, db_manager: DatabaseManager, on_elected):
+        super().__init__('worker-coordinator', float(os.getenv('LEADER_RETRY_INTERVAL', 5)))
+        self.path = os.path.join(run_dir, 'leader.lock')
+        self.db_manager = db_manager
+        self.on_elected = on_elected
+        self.lock_fd = None
+
+    def is_leader(self) -> bool:
+        return self.lock_fd is not None
+
+    def run_once(self):
+        if self.lock_fd is None:
+            self.try_lead()
+
+        # Multiprocess gauges are read from each worker's files, so every worker writes its own
+        if MULTIPROCESS_METRICS:
+            for name, pool in self.db_manager.pools().items():
+                metrics.observe_pool(name, pool.stats())
+            if self.lock_fd is not None:
+                metrics.observe_refresh_lag()
+
+    def try_lead(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.on_elected()
+        except BlockingIOError:
+            os.close(fd)
+            return
+        except Exception:
+            os.close(fd)
+            raise
+
+        self.lock_fd = fd
+        print(f"Worker {os.getpid()} is running the background jobs")
+
+    def release(self):
+        # Called once the background jobs have stopped, so the next leader never overlaps with them
+        if self.lock_fd is not None:
+            os.close(self.lock_fd)
+            self.lock_fd = None
+
+
+def start_background_jobs():
+    receipt_tracker.start()
+    if INDEXER_ENABLED:
+        block_indexer.load_addresses(notify=False)
+        block_indexer.start()
 
-        except Exception as e:
-            print(f"Error updating transactions: {str(e)}")
-            return 0
 
 # API Initialization
+# Endpoints that talk to MySQL or the Ethereum node are plain "def" functions,
+# so FastAPI runs them in a bounded thread pool instead of on the event loop
+metrics = Metrics()
 app = FastAPI()
-db_manager = DatabaseManager()
+app.router.route_class = TimedRoute
+app.add_middleware(MetricsMiddleware)
+db_manager = create_database_manager()
 eth_manager = EthereumManager()
+receipt_tracker = ReceiptTracker(db_manager, eth_manager)
+block_indexer = BlockIndexer(db_manager, eth_manager)
+# Stack sampling costs a little CPU per request, so the profiler only runs when a threshold is set
+request_profiler = SlowRequestProfiler(
+    os.getenv('SLOW_REQUEST_DIR', 'slow-requests'),
+    float(os.getenv('SLOW_REQUEST_THRESHOLD_MS', 0)) / 1000,
+    float(os.getenv('SLOW_REQUEST_SAMPLE_INTERVAL', 0.005)),
+    int(os.getenv('SLOW_REQUEST_KEEP', 100))
+) if os.getenv('SLOW_REQUEST_THRESHOLD_MS') else None
+
+# With several workers, in-memory state changes are passed on to the others and one elected worker runs the background jobs
+if API_WORKERS > 1:
+    worker_channel = WorkerChannel(WORKER_RUN_DIR, {
+        'head': lambda block_number: eth_manager.set_head(block_number, notify=False),
+        'balance': lambda address: eth_manager.balance_cache.invalidate(address.lower()),
+        # Fetching balances takes RPC calls, which must not hold up the messages queued behind it
+        'balances': lambda addresses: worker_channel.defer(eth_manager.notify_balances, addresses, notify=False),
+        'event': lambda addresses, event: eth_manager.event_bus.deliver(set(addresses), event),
+        'signer': lambda address: eth_manager.signer_cache.invalidate(address.lower()),
+        'wallet_added': lambda address, wallet_id: block_indexer.add_address(address, wallet_id, notify=False),
+        'wallet_removed': lambda address: block_indexer.remove_address(address, notify=False),
+        'wallets_reloaded': lambda: block_indexer.thread is not None and block_indexer.load_addresses(notify=False)
+    })
+    worker_coordinator = WorkerCoordinator(WORKER_RUN_DIR, db_manager, start_background_jobs)
+else:
+    worker_channel = None
+    worker_coordinator = None
+
+# Transaction history limits
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 1000))
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 500))
+
+# Block indexer
+INDEXER_ENABLED = os.getenv('INDEXER_ENABLED', 'true').lower() == 'true'
+
+# Batch limits
+MAX_BATCH_SEND = int(os.getenv('MAX_BATCH_SEND', 500))
+MAX_BATCH_CREATE = int(os.getenv('MAX_BATCH_CREATE', 10000))
+DB_INSERT_CHUNK_SIZE = int(os.getenv('DB_INSERT_CHUNK_SIZE', 1000))
+DERIVATION_WORKERS = int(os.getenv('DERIVATION_WORKERS', os.cpu_count() or 1))
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 1000))
+MAX_IMPORT_ERRORS = int(os.getenv('MAX_IMPORT_ERRORS', 100))
+IMPORT_MAX_LINE_BYTES = int(os.getenv('IMPORT_MAX_LINE_BYTES', 4096))
 
 # API Key Setup
 API_KEY = os.getenv("X-API-Key")
@@ -219,64 +2669,293 @@ async def get_api_key(api_key_header: str = Security(api_key_header)):
         raise HTTPException(status_code=HTTP_403_FORBIDDEN, detail="Missing or invalid API Key")
     return api_key_header
 
+async def get_metrics_access(api_key_header: str = Security(api_key_header)):
+    # Route traffic, the PENDING backlog and RPC endpoint names stay private unless the scraper can't send a key
+    if not METRICS_PUBLIC:
+        await get_api_key(api_key_header)
+
+# Record accepted transfers as PENDING transactions
+def record_transactions(rows: list[tuple]):
+    # Only taken once the node has accepted the transfers, so the write connection isn't held during RPC calls
+    conn = db_manager.get_connection()
+    cursor = conn.cursor()
+
+    try:
+        db_manager.insert_transactions(cursor, rows)
+        db_manager.add_wallet_stats(cursor, [(row[0], transaction_stats('OUT', 'PENDING', row[4], 0)) for row in rows])
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
 # Send ETH POST Request
 @app.post("/wallet/send")
-async def send_eth(wallet_data: WalletSend, api_key: str = Depends(get_api_key)):
-    conn = db_manager.create_connection()
+def send_eth(wallet_data: WalletSend, api_key: str = Depends(get_api_key)):
+    conn = db_manager.get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
-        cursor.execute("SELECT id FROM wallets WHERE address = %s", (wallet_data.from_address,))
-        wallet = cursor.fetchone()
-        if not wallet:
-            raise HTTPException(status_code=404, detail="Wallet not found")
+        wallet = db_manager.get_wallet(cursor, wallet_data.from_address)
+    finally:
+        cursor.close()
+        conn.close()
+
+    if not wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+
+    # Without a private key in the request the wallet's stored key signs the transaction
+    tx_hash = eth_manager.send_transaction(
+        wallet_data.from_address,
+        wallet_data.to_address,
+        wallet_data.amount,
+        wallet_data.private_key or wallet['private_key'],
+        wallet_data.urgency
+    )
+
+    record_transactions([(
+        wallet['id'],
+        tx_hash,
+        wallet_data.from_address,
+        wallet_data.to_address,
+        wallet_data.amount,
+        'PENDING'
+    )])
+
+    # The sent value and gas change both balances before the next block arrives
+    eth_manager.invalidate_balance(wallet_data.from_address)
+    eth_manager.invalidate_balance(wallet_data.to_address)
+    eth_manager.event_bus.publish({wallet_data.from_address, wallet_data.to_address}, {
+        'type': 'transaction',
+        'tx_hash': tx_hash,
+        'from_address': wallet_data.from_address,
+        'to_address': wallet_data.to_address,
+        'amount': wallet_data.amount,
+        'status': 'PENDING'
+    })
+
+    return {"tx_hash": tx_hash}
+
+# Send ETH batch POST Request
+@app.post("/wallet/send/batch", response_model=WalletSendBatchResponse)
+def send_eth_batch(batch_data: WalletSendBatch, api_key: str = Depends(get_api_key)):
+    if not batch_data.transfers:
+        raise HTTPException(status_code=400, detail="No transfers given")
+    if len(batch_data.transfers) > MAX_BATCH_SEND:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SEND} transfers per batch")
+
+    conn = db_manager.get_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
 
-        tx_hash = eth_manager.send_transaction(
-            wallet_data.from_address,
-            wallet_data.to_address,
-            wallet_data.amount,
-            wallet_data.private_key
+    try:
+        # Look up every sender with one query
+        senders = sorted({transfer.from_address for transfer in batch_data.transfers})
+        wallets = {wallet['address'].lower(): wallet for wallet in db_manager.get_wallets(cursor, senders)}
+        wallet_ids = {address: wallet['id'] for address, wallet in wallets.items()}
+    finally:
+        cursor.close()
+        conn.close()
+
+    results = [
+        TransferResult(
+            from_address=transfer.from_address,
+            to_address=transfer.to_address,
+            amount=transfer.amount
         )
+        for transfer in batch_data.transfers
+    ]
+
+    known = []
+    for index, transfer in enumerate(batch_data.transfers):
+        if transfer.from_address.lower() in wallet_ids:
+            known.append(index)
+        else:
+            results[index].error = "Wallet not found"
+
+    sent = eth_manager.send_transactions(
+        [batch_data.transfers[index] for index in known],
+        [
+            batch_data.transfers[index].private_key or wallets[batch_data.transfers[index].from_address.lower()]['private_key']
+            for index in known
+        ]
+    )
+
+    rows = []
+    for index, (tx_hash, error) in zip(known, sent):
+        transfer = batch_data.transfers[index]
+        results[index].tx_hash = tx_hash
+        results[index].error = error
+        if tx_hash is not None:
+            rows.append((
+                wallet_ids[transfer.from_address.lower()],
+                tx_hash,
+                transfer.from_address,
+                transfer.to_address,
+                transfer.amount,
+                'PENDING'
+            ))
+
+    # Record every accepted transaction with one bulk INSERT
+    if rows:
+        record_transactions(rows)
+
+    for _, _, from_address, to_address, _, _ in rows:
+        eth_manager.invalidate_balance(from_address)
+        eth_manager.invalidate_balance(to_address)
+
+    return {"results": results}
+
+# eth_account takes most of a second to import, so it is loaded on first use or by the startup warm-up
+@lru_cache(maxsize=None)
+def load_account():
+    from eth_account import Account
+    Account.enable_unaudited_hdwallet_features()
+    return Account
+
+# Key derivation is CPU bound, so it runs in worker processes instead of threads
+process_pool = None
+HD_PARENT_PATH = "m/44'/60'/0'/0"
+# Indexes from 2**31 up are hardened, and derivation_index is a signed INT on MySQL
+HD_MAX_INDEX = 2 ** 31
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global process_pool
+    if process_pool is None:
+        # Forking this multi-threaded process could copy a lock another thread holds, so start workers from a clean server
+        # (Windows has no forkserver; spawn is just as safe, only slower to start)
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        process_pool = ProcessPoolExecutor(max_workers=DERIVATION_WORKERS, mp_context=multiprocessing.get_context(start_method))
+    return process_pool
+
+def derive_parent_node(seed: bytes) -> tuple[bytes, bytes] | None:
+    # Key and chain code of m/44'/60'/0'/0, the parent of every batch wallet;
+    # None if eth_account no longer has the private helpers the fast path uses
+    try:
+        from eth_account.hdaccount.deterministic import HDPath, derive_child_key, hmac_sha512
+        path = HDPath(HD_PARENT_PATH)._path
+    except (ImportError, AttributeError):
+        return None
+    main_node = hmac_sha512(b"Bitcoin seed", seed)
+    key, chain_code = main_node[:32], main_node[32:]
+    for node in path:
+        key, chain_code = derive_child_key(key, chain_code, node)
+    return key, chain_code
+
+def derive_accounts(seed: bytes, parent_node: tuple[bytes, bytes] | None, start: int, stop: int) -> list[tuple[int, str, str]]:
+    Account = load_account()
+    try:
+        from eth_account.hdaccount.deterministic import SoftNode, SECP256K1_N, derive_child_key, ec_point, hmac_sha512
+    except ImportError:
+        parent_node = None
+
+    accounts = []
+    if parent_node is None:
+        # Every path from the seed through the public API: slower, but it doesn't depend on eth_account internals
+        from eth_account.hdaccount import key_from_seed
+        for index in range(start, stop):
+            account = Account.from_key(key_from_seed(seed, f"{HD_PARENT_PATH}/{index}"))
+            accounts.append((index, account.address, account.key.hex()))
+        return accounts
+
+    # BIP32 soft children of one parent only differ by index, so the parent's public point is computed once
+    parent_key, parent_chain_code = parent_node
+    parent_point = ec_point(parent_key)
+
+    for index in range(start, stop):
+        child = hmac_sha512(parent_chain_code, parent_point + index.to_bytes(4, 'big'))
+        child_key = (int.from_bytes(child[:32], 'big') + int.from_bytes(parent_key, 'big')) % SECP256K1_N
+        if int.from_bytes(child[:32], 'big') >= SECP256K1_N or child_key == 0:
+            # Invalid child (probability below 2**-127); let eth_account apply the BIP32 fallback
+            key = derive_child_key(parent_key, parent_chain_code, SoftNode(index))[0]
+        else:
+            key = child_key.to_bytes(32, 'big')
+
+        account = Account.from_key(key)
+        accounts.append((index, account.address, account.key.hex()))
+    return accounts
+
+def derive_accounts_parallel(seed: bytes, start: int, count: int) -> list[tuple[int, str, str]]:
+    parent_node = derive_parent_node(seed)
+
+    # Small batches aren't worth the round trip to the worker processes
+    if count < 64:
+        return derive_accounts(seed, parent_node, start, start + count)
+
+    chunk_size = max(16, count // (DERIVATION_WORKERS * 4))
+    starts = list(range(start, start + count, chunk_size))
+    stops = [min(chunk_start + chunk_size, start + count) for chunk_start in starts]
+
+    accounts = []
+    for chunk in get_process_pool().map(derive_accounts, repeat(seed), repeat(parent_node), starts, stops):
+        accounts.extend(chunk)
+    return accounts
+
+# Create wallets batch POST Request
+@app.post("/wallets/create/batch", response_model=WalletCreateBatchResponse)
+def create_wallets_batch(batch_data: WalletCreateBatch, api_key: str = Depends(get_api_key)):
+    if not 1 <= batch_data.count <= MAX_BATCH_CREATE:
+        raise HTTPException(status_code=400, detail=f"count must be between 1 and {MAX_BATCH_CREATE}")
+    if batch_data.start_index < 0:
+        raise HTTPException(status_code=400, detail="start_index must not be negative")
+    if batch_data.start_index + batch_data.count > HD_MAX_INDEX:
+        raise HTTPException(status_code=400, detail=f"start_index + count must not exceed {HD_MAX_INDEX}")
+
+    from eth_account.hdaccount import generate_mnemonic, seed_from_mnemonic
+    started = time.perf_counter()
+    mnemonic = batch_data.mnemonic_phrase or generate_mnemonic(num_words=12, lang="english")
+
+    # One PBKDF2 seed derivation for the whole batch
+    try:
+        seed = seed_from_mnemonic(mnemonic, "")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid mnemonic phrase: {str(e)}")
+    accounts = derive_accounts_parallel(seed, batch_data.start_index, batch_data.count)
 
-        cursor.execute("""
-            INSERT INTO transactions
-            (wallet_id, tx_hash, from_address, to_address, amount, status)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (
-            wallet['id'],
-            tx_hash,
-            wallet_data.from_address,
-            wallet_data.to_address,
-            wallet_data.amount,
-            'PENDING'
-        ))
+    conn = db_manager.get_connection()
+    cursor = conn.cursor()
 
-        conn.commit()
-        return {"tx_hash": tx_hash}
+    try:
+        rows = [
+            (address, private_key, f"{batch_data.wallet_name} {index}", index)
+            for index, address, private_key in accounts
+        ]
+        for chunk_start in range(0, len(rows), DB_INSERT_CHUNK_SIZE):
+            db_manager.insert_derived_wallets(cursor, rows[chunk_start:chunk_start + DB_INSERT_CHUNK_SIZE])
 
+        conn.commit()
+        eth_manager.change_versions.bump([row[0] for row in rows])
+    except db_manager.Error as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Error saving wallets: {str(e)}")
     finally:
         cursor.close()
         conn.close()
 
-# Enable HD Wallet Features
-Account.enable_unaudited_hdwallet_features()
+    block_indexer.load_addresses()
+
+    seconds = time.perf_counter() - started
+    return WalletCreateBatchResponse(
+        mnemonic_phrase=mnemonic,
+        wallets=[WalletBatchEntry(address=address, derivation_index=index) for index, address, _ in accounts],
+        seconds=round(seconds, 6),
+        wallets_per_second=round(len(accounts) / seconds, 2)
+    )
 
 # Create wallet POST Request
 @app.post("/wallet/create", response_model=WalletResponse)
-async def create_wallet(wallet_data: WalletCreate, api_key: str = Depends(get_api_key)):
+def create_wallet(wallet_data: WalletCreate, api_key: str = Depends(get_api_key)):
+    from eth_account.hdaccount import generate_mnemonic
     try:
         mnemonic = generate_mnemonic(num_words=12, lang="english")
-        account = Account.from_mnemonic(mnemonic)
-        conn = db_manager.create_connection()
+        account = load_account().from_mnemonic(mnemonic)
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
 
         try:
-            cursor.execute("""
-                INSERT INTO wallets (address, private_key, wallet_name)
-                VALUES (%s, %s, %s)
-            """, (account.address, account.key.hex(), wallet_data.wallet_name))
+            wallet_id = db_manager.insert_wallet(cursor, account.address, account.key.hex(), wallet_data.wallet_name)
 
             conn.commit()
+            block_indexer.add_address(account.address, wallet_id)
+            eth_manager.change_versions.bump([account.address])
 
             return WalletResponse(
                 address=account.address,
@@ -284,7 +2963,7 @@ async def create_wallet(wallet_data: WalletCreate, api_key: str = Depends(get_ap
                 wallet_name=wallet_data.wallet_name,
                 mnemonic_phrase=mnemonic
             )
-        except mysql.connector.Error as e:
+        except db_manager.Error as e:
             raise HTTPException(status_code=500, detail=f"Error saving wallet: {str(e)}")
         finally:
             cursor.close()
@@ -292,20 +2971,166 @@ async def create_wallet(wallet_data: WalletCreate, api_key: str = Depends(get_ap
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating wallet: {str(e)}")
 
+# Bulk import helpers
+def addresses_from_keys(private_keys: list[str]) -> list[str | None]:
+    Account = load_account()
+    addresses = []
+    for private_key in private_keys:
+        try:
+            addresses.append(Account.from_key(private_key).address)
+        except Exception:
+            addresses.append(None)
+    return addresses
+
+async def read_lines(request: Request):
+    # Split the upload into (line number, text, error) as it arrives instead of reading the whole body.
+    # A line over IMPORT_MAX_LINE_BYTES is dropped while it streams in, so it can't fill up memory.
+    buffer = b""
+    line_number = 0
+    oversized = False
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if oversized or len(line) > IMPORT_MAX_LINE_BYTES:
+                oversized = False
+                yield line_number, None, f"Line longer than {IMPORT_MAX_LINE_BYTES} bytes"
+            else:
+                yield line_number, *decode_import_line(line)
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            oversized = True
+            buffer = b""
+    if oversized:
+        yield line_number + 1, None, f"Line longer than {IMPORT_MAX_LINE_BYTES} bytes"
+    elif buffer.strip():
+        yield line_number + 1, *decode_import_line(buffer)
+
+def decode_import_line(line: bytes) -> tuple[str | None, str | None]:
+    try:
+        return line.decode().strip(), None
+    except UnicodeDecodeError:
+        return None, "Line is not valid UTF-8"
+
+def parse_import_line(line: str, ndjson: bool) -> tuple[str, str | None]:
+    if ndjson:
+        entry = json.loads(line)
+        return entry['private_key'], entry.get('wallet_name')
+
+    fields = next(csv.reader([line]))
+    return fields[0].strip(), fields[1].strip() if len(fields) > 1 else None
+
+def report_import_error(result: WalletImportBulkResponse, line_number: int, error: str):
+    # Only the first errors are kept so huge imports don't grow the response
+    if len(result.errors) < MAX_IMPORT_ERRORS:
+        result.errors.append(WalletImportError(line=line_number, error=error))
+
+def save_import_chunk(entries: list[tuple[int, str, str, str]], result: WalletImportBulkResponse):
+    conn = db_manager.get_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        existing = db_manager.existing_addresses(cursor, [address for _, _, _, address in entries])
+
+        rows = []
+        for line_number, private_key, wallet_name, address in entries:
+            if address.lower() in existing:
+                result.duplicates += 1
+                report_import_error(result, line_number, f"Duplicate wallet {address}")
+                continue
+            existing.add(address.lower())
+            rows.append((address, private_key, wallet_name))
+
+        if rows:
+            # Skipping existing wallets keeps one imported concurrently from aborting the chunk
+            inserted = db_manager.insert_new_wallets(cursor, rows)
+            conn.commit()
+            eth_manager.change_versions.bump([address for address, _, _ in rows])
+            result.imported += inserted
+            result.duplicates += len(rows) - inserted
+    finally:
+        cursor.close()
+        conn.close()
+
+async def import_chunk(rows: list[tuple[int, str, str]], result: WalletImportBulkResponse):
+    # Derive the addresses in worker processes, one slice per worker
+    loop = asyncio.get_running_loop()
+    slice_size = max(1, -(-len(rows) // DERIVATION_WORKERS))
+    keys = [private_key for _, private_key, _ in rows]
+    slices = await asyncio.gather(*[
+        loop.run_in_executor(get_process_pool(), addresses_from_keys, keys[start:start + slice_size])
+        for start in range(0, len(keys), slice_size)
+    ])
+    addresses = [address for addresses_slice in slices for address in addresses_slice]
+
+    entries = []
+    for (line_number, private_key, wallet_name), address in zip(rows, addresses):
+        if address is None:
+            result.invalid += 1
+            report_import_error(result, line_number, "Invalid Private Key")
+            continue
+        entries.append((line_number, private_key, wallet_name, address))
+
+    if entries:
+        await run_in_threadpool(save_import_chunk, entries, result)
+
+# Import wallets bulk POST Request (CSV or NDJSON body)
+@app.post("/wallets/import/bulk", response_model=WalletImportBulkResponse)
+async def import_wallets_bulk(request: Request, api_key: str = Depends(get_api_key)):
+    started = time.perf_counter()
+    ndjson = "json" in request.headers.get("content-type", "")
+    result = WalletImportBulkResponse()
+
+    rows = []
+    async for line_number, line, error in read_lines(request):
+        if error:
+            result.invalid += 1
+            report_import_error(result, line_number, error)
+            continue
+        if not line:
+            continue
+        # Optional CSV header
+        if line_number == 1 and not ndjson and "private_key" in line.lower():
+            continue
+
+        try:
+            private_key, wallet_name = parse_import_line(line, ndjson)
+        except Exception:
+            result.invalid += 1
+            report_import_error(result, line_number, "Unreadable line")
+            continue
+
+        if not private_key.startswith('0x'):
+            private_key = '0x' + private_key
+        rows.append((line_number, private_key, wallet_name or f"Imported {line_number}"))
+
+        if len(rows) >= IMPORT_CHUNK_SIZE:
+            await import_chunk(rows, result)
+            rows = []
+
+    if rows:
+        await import_chunk(rows, result)
+
+    if result.imported:
+        await run_in_threadpool(block_indexer.load_addresses)
+
+    result.seconds = round(time.perf_counter() - started, 6)
+    result.wallets_per_second = round(result.imported / result.seconds, 2) if result.seconds else 0.0
+    return result
+
 # Get wallet GET Request
 @app.get("/wallet/{address}", response_model=WalletResponse)
-async def get_wallet(address: str, api_key: str = Depends(get_api_key)):
-    conn = db_manager.create_connection()
+def get_wallet(address: str, api_key: str = Depends(get_api_key)):
+    conn = db_manager.get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
-        cursor.execute("SELECT * FROM wallets WHERE address = %s", (address,))
-        wallet = cursor.fetchone()
+        wallet = db_manager.get_wallet(cursor, address)
 
         if wallet is None:
             raise HTTPException(status_code=404, detail="Wallet not found")
 
-        balance = eth_manager.w3.eth.get_balance(address)
+        balance = eth_manager.get_balances([address])[address]
         wallet['balance'] = eth_manager.w3.from_wei(balance, 'ether')
 
         return wallet
@@ -315,25 +3140,26 @@ async def get_wallet(address: str, api_key: str = Depends(get_api_key)):
 
 # Delete wallet DELETE Request
 @app.delete("/wallet/{address}")
-async def delete_wallet(address: str, api_key: str = Depends(get_api_key)):
-    conn = db_manager.create_connection()
+def delete_wallet(address: str, api_key: str = Depends(get_api_key)):
+    conn = db_manager.get_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
-        cursor.execute("SELECT id FROM wallets WHERE address = %s", (address,))
-        wallet = cursor.fetchone()
+        wallet = db_manager.get_wallet(cursor, address)
 
         if not wallet:
             raise HTTPException(status_code=404, detail="Wallet not found")
 
-        cursor.execute("DELETE FROM transactions WHERE wallet_id = %s", (wallet['id'],))
-
-        cursor.execute("DELETE FROM wallets WHERE id = %s", (wallet['id'],))
+        db_manager.delete_wallet(cursor, wallet['id'])
 
         conn.commit()
+        block_indexer.remove_address(address)
+        eth_manager.signer_cache.invalidate(address.lower())
+        share('signer', address=address)
+        eth_manager.change_versions.bump([address])
         return {"message": "Wallet successfully deleted"}
 
-    except mysql.connector.Error as e:
+    except db_manager.Error as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
@@ -342,17 +3168,22 @@ async def delete_wallet(address: str, api_key: str = Depends(get_api_key)):
 
 # Get all wallets GET Request
 @app.get("/wallets", response_model=list[WalletListResponse])
-async def get_all_wallets(api_key: str = Depends(get_api_key)):
-    conn = db_manager.create_connection()
+def get_all_wallets(request: Request, response: Response, api_key: str = Depends(get_api_key)):
+    # Balances are read at the head block, so a new block changes the tag too
+    not_modified = check_etag(request, response, eth_manager.change_versions.etag(None, eth_manager.get_head()))
+    if not_modified:
+        return not_modified
+
+    conn = db_manager.get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
-        cursor.execute("SELECT address, wallet_name, created_at FROM wallets")
-        wallets = cursor.fetchall()
+        wallets = db_manager.list_wallets(cursor)
 
+        # Fetch all balances in a few batched RPC requests instead of one request per wallet
+        balances = eth_manager.get_balances([wallet['address'] for wallet in wallets])
         for wallet in wallets:
-            balance = eth_manager.w3.eth.get_balance(wallet['address'])
-            wallet['balance'] = eth_manager.w3.from_wei(balance, 'ether')
+            wallet['balance'] = eth_manager.w3.from_wei(balances[wallet['address']], 'ether')
 
         return wallets
     finally:
@@ -361,29 +3192,28 @@ async def get_all_wallets(api_key: str = Depends(get_api_key)):
 
 # Import wallet POST Request
 @app.post("/wallet/import", response_model=WalletResponse)
-async def import_wallet(wallet_data: WalletImport, api_key: str = Depends(get_api_key)):
+def import_wallet(wallet_data: WalletImport, api_key: str = Depends(get_api_key)):
     try:
         if not wallet_data.private_key.startswith('0x'):
             wallet_data.private_key = '0x' + wallet_data.private_key
 
-        account = Account.from_key(wallet_data.private_key)
-        conn = db_manager.create_connection()
+        account = load_account().from_key(wallet_data.private_key)
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
 
         try:
-            cursor.execute("""
-                INSERT INTO wallets (address, private_key, wallet_name)
-                VALUES (%s, %s, %s)
-            """, (account.address, wallet_data.private_key, wallet_data.wallet_name))
+            wallet_id = db_manager.insert_wallet(cursor, account.address, wallet_data.private_key, wallet_data.wallet_name)
 
             conn.commit()
+            block_indexer.add_address(account.address, wallet_id)
+            eth_manager.change_versions.bump([account.address])
 
             return WalletResponse(
                 address=account.address,
                 private_key=wallet_data.private_key,
                 wallet_name=wallet_data.wallet_name
             )
-        except mysql.connector.Error as e:
+        except db_manager.Error as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Error saving imported wallet: {str(e)}"
@@ -398,71 +3228,295 @@ async def import_wallet(wallet_data: WalletImport, api_key: str = Depends(get_ap
             detail="Invalid Private Key"
         )
 
+# Transaction history helpers
+TRANSACTION_COLUMNS = """
+    t.id,
+    t.wallet_id,
+    t.tx_hash,
+    t.from_address,
+    t.to_address,
+    CAST(t.amount AS FLOAT) as amount,
+    COALESCE(CAST(t.gas_used AS FLOAT), 0.0) as gas_used,
+    t.status,
+    t.direction,
+    t.created_at
+"""
+
+def encode_cursor(transaction: dict) -> str:
+    value = f"{transaction['created_at'].isoformat()}|{transaction['id']}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+def decode_cursor(after: str) -> tuple[datetime, int]:
+    try:
+        created_at, transaction_id = base64.urlsafe_b64decode(after.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def stream_history(conn, cursor):
+    # Read rows from the server in chunks and emit one JSON document per line
+    try:
+        while True:
+            transactions = cursor.fetchmany(STREAM_CHUNK_SIZE)
+            if not transactions:
+                break
+            yield "".join(
+                TransactionResponse.model_validate(transaction).model_dump_json() + "\n"
+                for transaction in transactions
+            )
+    finally:
+        try:
+            cursor.close()
+        except db_manager.Error:
+            pass  # A client that left mid-stream leaves unread rows behind; the pool drops that connection
+        finally:
+            conn.close()
+
+def check_etag(request: Request, response: Response, etag: str) -> Response | None:
+    # Answer 304 without reading the history when the client's copy is still current
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+def history_response(conn, cursor, response: Response, response_format: str, limit: int | None):
+    if response_format == "ndjson":
+        headers = {"ETag": response.headers["ETag"]} if "ETag" in response.headers else None
+        return StreamingResponse(stream_history(conn, cursor), media_type="application/x-ndjson", headers=headers)
+
+    transactions = cursor.fetchall()
+    if limit is not None and len(transactions) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(transactions[-1])
+    return transactions
+
 # Get all transactions GET Request
 @app.get("/transactions", response_model=list[TransactionResponse])
-async def get_all_transactions(api_key: str = Depends(get_api_key)):
-    conn = db_manager.create_connection()
+def get_all_transactions(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+    api_key: str = Depends(get_api_key)
+):
+    # Each format and page is its own representation, so it gets its own tag
+    not_modified = check_etag(request, response, eth_manager.change_versions.etag(None, response_format, limit, after))
+    if not_modified:
+        return not_modified
+
+    conn = db_manager.get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
+    streaming = False
 
     try:
-        cursor.execute("SELECT transactions.*, wallets.address as from_address, wallets.wallet_name FROM transactions JOIN wallets ON transactions.wallet_id = wallets.id")
-        transactions = cursor.fetchall()
+        db_manager.list_transactions(cursor, None, decode_cursor(after) if after else None, limit)
 
-        return transactions
+        streaming = response_format == "ndjson"
+        return history_response(conn, cursor, response, response_format, limit)
     finally:
-        cursor.close()
-        conn.close()
+        # A streaming response closes the connection once the last row is sent
+        if not streaming:
+            cursor.close()
+            conn.close()
 
 # Get wallet transactions GET Request
 @app.get("/wallet/{address}/transactions", response_model=list[TransactionResponse])
-async def get_wallet_transactions(address: str, api_key: str = Depends(get_api_key)):
-    conn = db_manager.create_connection()
+def get_wallet_transactions(
+    address: str,
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+    api_key: str = Depends(get_api_key)
+):
+    conn = db_manager.get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
+    streaming = False
 
     try:
-        updated_count = eth_manager.refresh_transactions(conn, cursor)
-        cursor.execute("SELECT id FROM wallets WHERE address = %s", (address,))
-        wallet = cursor.fetchone()
+        wallet = db_manager.get_wallet(cursor, address)
 
+        # Checked before the tag: an address that was never bumped would match a guessed tag
         if not wallet:
             raise HTTPException(status_code=404, detail="Wallet not found")
 
-        cursor.execute("""
-            SELECT
-                t.id,
-                t.wallet_id,
-                t.tx_hash,
-                t.from_address,
-                t.to_address,
-                CAST(t.amount AS FLOAT) as amount,
-                COALESCE(CAST(t.gas_used AS FLOAT), 0.0) as gas_used,
-                t.status,
-                t.created_at
-            FROM transactions t
-            WHERE t.wallet_id = %s
-            ORDER BY t.created_at DESC
-        """, (wallet['id'],))
-
-        transactions = cursor.fetchall()
-        return transactions
+        not_modified = check_etag(request, response, eth_manager.change_versions.etag(address, response_format, limit, after))
+        if not_modified:
+            return not_modified
+
+        db_manager.list_transactions(cursor, wallet['id'], decode_cursor(after) if after else None, limit)
 
+        streaming = response_format == "ndjson"
+        return history_response(conn, cursor, response, response_format, limit)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if not streaming:
+            cursor.close()
+            conn.close()
+
+# Get wallet stats GET Request
+@app.get("/wallet/{address}/stats", response_model=WalletStatsResponse)
+def get_wallet_stats(address: str, api_key: str = Depends(get_api_key)):
+    conn = db_manager.get_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        stats = db_manager.get_wallet_stats(cursor, address)
+
+        if not stats:
+            raise HTTPException(status_code=404, detail="Wallet not found")
+
+        # A wallet without transactions has no stats row yet
+        return {key: value for key, value in stats.items() if value is not None}
     finally:
         cursor.close()
         conn.close()
 
+# Subscribe to events GET Request (Server-Sent Events)
+@app.get("/events")
+async def stream_events(addresses: str = Query(...), api_key: str = Depends(get_api_key)):
+    watched = {address.strip() for address in addresses.split(",") if address.strip()}
+    if not watched:
+        raise HTTPException(status_code=400, detail="No addresses given")
+
+    subscription = eth_manager.event_bus.subscribe(watched)
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=EVENT_KEEPALIVE)
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                except asyncio.TimeoutError:
+                    # Comment lines keep proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            eth_manager.event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 # Get version GET Request
 @app.get("/version", response_model=VersionResponse)
 async def get_version(api_key: str = Depends(get_api_key)):
     return {"version": db_manager.version}
 
+# Get stats GET Request
+@app.get("/stats")
+async def get_stats(api_key: str = Depends(get_api_key)):
+    return {
+        "balance_cache": eth_manager.balance_cache.stats(),
+        "signer_cache": eth_manager.signer_cache.stats(),
+        "rpc_endpoints": eth_manager.w3.provider.stats(),
+        "fee_oracle": eth_manager.fee_oracle.stats(),
+        **({"request_profiler": request_profiler.stats()} if request_profiler else {}),
+        **({"worker": {"pid": os.getpid(), "leader": worker_coordinator.is_leader()}} if worker_coordinator else {}),
+        **{name: pool.stats() for name, pool in db_manager.pools().items()}
+    }
+
+# Get metrics GET Request (Prometheus text format)
+@app.get("/metrics")
+def get_metrics(access: None = Depends(get_metrics_access)):
+    for name, pool in db_manager.pools().items():
+        metrics.observe_pool(name, pool.stats())
+    if MULTIPROCESS_METRICS:
+        # Every worker writes its metrics to PROMETHEUS_MULTIPROC_DIR; report them together
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Startup Event POST Request
 @app.on_event("startup")
 async def startup_event():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = int(os.getenv('API_THREADS', 40))
+    for route in app.routes:
+        for method in getattr(route, 'methods', None) or ():
+            metrics.child(metrics.request_latency, method, route.path)
+    # Not awaited: web3 and eth_account load in the background while the first requests are served
+    threading.Thread(target=eth_manager.warm_up, name='warm-up', daemon=True).start()
+    await run_in_threadpool(db_manager.init_database)
+    eth_manager.fee_oracle.start()
+    if request_profiler is not None:
+        request_profiler.start()
+    if worker_coordinator is not None:
+        # Created here rather than at import so the process that launches the workers leaves no files behind
+        eth_manager.change_versions = SharedChangeVersions(
+            os.path.join(WORKER_RUN_DIR, 'versions'),
+            int(os.getenv('ETAG_SLOTS', 65536))
+        )
+        eth_manager.nonce_manager = SharedNonceManager(eth_manager.get_pending_nonce, os.path.join(WORKER_RUN_DIR, 'nonces'))
+        worker_channel.start()
+        worker_coordinator.start()
+    else:
+        await run_in_threadpool(start_background_jobs)
+
+# Shutdown Event
+@app.on_event("shutdown")
+async def shutdown_event():
+    await run_in_threadpool(eth_manager.fee_oracle.stop)
+    if request_profiler is not None:
+        await run_in_threadpool(request_profiler.stop)
+    if worker_coordinator is not None:
+        await run_in_threadpool(worker_coordinator.stop)
+    await run_in_threadpool(receipt_tracker.stop)
+    await run_in_threadpool(block_indexer.stop)
+    if worker_coordinator is not None:
+        worker_coordinator.release()
+        worker_channel.stop()
+        if MULTIPROCESS_METRICS:
+            multiprocess.mark_process_dead(os.getpid())
+
+
+# Recompute wallet_stats from the transactions table
+def rebuild_stats():
     db_manager.init_database()
+    conn = db_manager.get_connection()
+    cursor = conn.cursor(dictionary=True)
 
+    try:
+        db_manager.rebuild_wallet_stats(cursor)
+        conn.commit()
+        print(f"Rebuilt stats for {db_manager.count_wallet_stats(cursor)} wallets")
+    finally:
+        cursor.close()
+        conn.close()
 
-if __name__ == "__main__":
+
+# Run the API, in API_WORKERS processes sharing one listening socket
+def serve(host: str = "0.0.0.0", port: int = 8000):
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if API_WORKERS == 1:
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    import shutil
+    from uvicorn.supervisors import Multiprocess
+
+    # Each worker imports run:app on its own; they find each other through a fresh run directory
+    run_dir = tempfile.mkdtemp(prefix='wallet-api-')
+    os.environ['WORKER_RUN_DIR'] = run_dir
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(run_dir, 'metrics'))
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+    config = uvicorn.Config("run:app", host=host, port=port, workers=API_WORKERS)
+    sock = config.bind_socket()
+    # asyncio skips TCP_NODELAY on the socket uvicorn hands to its workers, adding ~40 ms to every response;
+    # accepted connections inherit the option from the listening socket
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        Multiprocess(config, sockets=[sock]).run()
+    finally:
+        sock.close()
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["rebuild-stats"]:
+        rebuild_stats()
+    else:
+        serve()
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# run.py builds its database manager when it is imported, so the environment is set before any test imports it
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='wallet-tests-'), 'wallet.db')
+os.environ['APP_VERSION'] = 'test'
+os.environ['X-API-Key'] = 'test'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
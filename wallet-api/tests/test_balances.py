@@ -0,0 +1,68 @@
+import math
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import run
+from benchmark import FakeChain, FakeRPCHandler
+
+
+# Counts the HTTP requests that reach the fake node
+class CountingRPCHandler(FakeRPCHandler):
+    posts = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        with CountingRPCHandler.lock:
+            CountingRPCHandler.posts += 1
+        super().do_POST()
+
+
+@pytest.fixture
+def fake_node():
+    CountingRPCHandler.chain = FakeChain(11155111, block_time=60)
+    CountingRPCHandler.posts = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CountingRPCHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def addresses(count: int) -> list[str]:
+    return ['0x%040x' % (index + 1) for index in range(count)]
+
+
+def count_round_trips(monkeypatch, rpc_url: str, batch_size: int, wallet_count: int) -> int:
+    monkeypatch.setenv('ETH_RPC_URL', rpc_url)
+    monkeypatch.setenv('RPC_BATCH_SIZE', str(batch_size))
+    monkeypatch.setenv('RPC_HEDGE_DELAY', '30')  # No hedged copies, so every POST is a round trip the caller waited for
+    eth_manager = run.EthereumManager()
+
+    started = CountingRPCHandler.posts
+    balances = eth_manager.get_balances(addresses(wallet_count))
+    assert len(balances) == wallet_count
+    assert set(balances.values()) == {10 ** 24}
+    return CountingRPCHandler.posts - started
+
+
+def test_round_trips_stay_flat_as_wallet_count_grows(fake_node, monkeypatch):
+    # One eth_blockNumber call plus one batch, however many wallets there are
+    round_trips = [count_round_trips(monkeypatch, fake_node, 1000, count) for count in (10, 100, 1000)]
+    assert round_trips == [2, 2, 2]
+
+
+@pytest.mark.parametrize('wallet_count', [10, 100, 1000])
+def test_round_trips_grow_by_batch(fake_node, monkeypatch, wallet_count):
+    assert count_round_trips(monkeypatch, fake_node, 100, wallet_count) == 1 + math.ceil(wallet_count / 100)
+
+
+def test_cached_balances_skip_the_node(fake_node, monkeypatch):
+    monkeypatch.setenv('ETH_RPC_URL', fake_node)
+    eth_manager = run.EthereumManager()
+    eth_manager.get_balances(addresses(100))
+
+    started = CountingRPCHandler.posts
+    eth_manager.get_balances(addresses(100))
+    assert CountingRPCHandler.posts == started
@@ -0,0 +1,66 @@
+import sys
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+import run
+
+MNEMONIC = "test test test test test test test test test test test junk"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    run.db_manager.init_database()
+    monkeypatch.setattr(run.block_indexer, 'load_addresses', lambda notify=True: None)
+    return TestClient(run.app, headers={'X-API-Key': 'test'})
+
+
+@pytest.mark.parametrize('start_index, count', [(2 ** 31 - 2, 3), (2 ** 31, 1)])
+def test_indexes_past_the_soft_range_are_rejected(client, start_index, count):
+    response = client.post('/wallets/create/batch', json={'wallet_name': 'hd', 'count': count, 'start_index': start_index, 'mnemonic_phrase': MNEMONIC})
+    assert response.status_code == 400
+
+
+def test_last_soft_index_matches_the_bip44_path(client):
+    from eth_account import Account
+    Account.enable_unaudited_hdwallet_features()
+
+    response = client.post('/wallets/create/batch', json={'wallet_name': 'hd', 'count': 1, 'start_index': 2 ** 31 - 1, 'mnemonic_phrase': MNEMONIC})
+    assert response.status_code == 200
+    [wallet] = response.json()['wallets']
+    assert wallet['derivation_index'] == 2 ** 31 - 1
+    assert wallet['address'] == Account.from_mnemonic(MNEMONIC, account_path=f"m/44'/60'/0'/0/{2 ** 31 - 1}").address
+
+
+def test_worker_processes_derive_the_same_keys():
+    from eth_account.hdaccount import seed_from_mnemonic
+    seed = seed_from_mnemonic(MNEMONIC, "")
+    parent_node = run.derive_parent_node(seed)
+
+    # 200 wallets go through the process pool; the in-process derivation is the reference
+    assert run.derive_accounts_parallel(seed, 0, 200) == run.derive_accounts(seed, parent_node, 0, 200)
+    assert run.process_pool._mp_context.get_start_method() == 'forkserver'
+
+
+def test_public_api_fallback_matches_the_fast_path(monkeypatch):
+    from eth_account.hdaccount import seed_from_mnemonic
+    seed = seed_from_mnemonic(MNEMONIC, "")
+    expected = run.derive_accounts(seed, run.derive_parent_node(seed), 0, 20)
+
+    # An eth_account release without the private helpers
+    monkeypatch.setitem(sys.modules, 'eth_account.hdaccount.deterministic', types.ModuleType('deterministic'))
+    assert run.derive_parent_node(seed) is None
+    assert run.derive_accounts(seed, None, 0, 20) == expected
+
+
+def test_pool_uses_spawn_without_forkserver(monkeypatch):
+    # As on Windows
+    monkeypatch.setattr(run.multiprocessing, 'get_all_start_methods', lambda: ['spawn'])
+    monkeypatch.setattr(run, 'process_pool', None)
+    pool = run.get_process_pool()
+    try:
+        assert pool._mp_context.get_start_method() == 'spawn'
+        assert pool.submit(sum, [1, 2]).result() == 3
+    finally:
+        pool.shutdown()
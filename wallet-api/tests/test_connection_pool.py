@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import run
+
+
+# Stands in for a driver connection; the test decides when the server has dropped it
+class StubConnection:
+    def __init__(self, number: int):
+        self.number = number
+        self.connected = True
+        self.closed = False
+        self.pings = 0
+
+    def is_connected(self) -> bool:
+        self.pings += 1
+        return self.connected
+
+    def rollback(self):
+        if not self.connected:
+            raise ConnectionError("server has gone away")
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(size: int = 1, max_overflow: int = 1, timeout: float = 0.1, ping_after: float = 60):
+    opened = []
+
+    def connect():
+        opened.append(StubConnection(len(opened) + 1))
+        return opened[-1]
+
+    return run.ConnectionPool(connect, size, max_overflow, timeout, ping_after), opened
+
+
+def test_overflow_connections_are_closed_on_release():
+    pool, opened = make_pool(size=1, max_overflow=1)
+    first, second = pool.acquire(), pool.acquire()
+    assert len(opened) == 2
+    assert pool.stats()['open'] == 2
+
+    pool.release(first)
+    pool.release(second)
+    # Only `size` connections stay idle; the overflow one is closed
+    assert (first.closed, second.closed) == (False, True)
+    assert pool.stats()['open'] == 1
+    assert pool.acquire() is first
+
+
+def test_acquire_times_out_when_the_pool_is_exhausted():
+    pool, opened = make_pool(size=1, max_overflow=1, timeout=0.1)
+    pool.acquire()
+    pool.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(HTTPException) as error:
+        pool.acquire()
+    assert error.value.status_code == 503
+    assert time.monotonic() - started >= 0.1
+    assert len(opened) == 2
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_waiter_gets_a_released_connection():
+    pool, opened = make_pool(size=1, max_overflow=0, timeout=5)
+    conn = pool.acquire()
+    threading.Timer(0.05, pool.release, (conn,)).start()
+
+    assert pool.acquire() is conn
+    stats = pool.stats()
+    assert (stats['waits'], stats['timeouts'], len(opened)) == (1, 0, 1)
+
+
+def test_dropped_idle_connection_is_replaced_on_borrow():
+    pool, opened = make_pool(ping_after=0)
+    conn = pool.acquire()
+    pool.release(conn)
+
+    conn.connected = False
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert conn.closed
+    assert pool.stats()['open'] == 1
+
+
+def test_recently_returned_connection_is_not_pinged():
+    pool, opened = make_pool(ping_after=60)
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+    assert conn.pings == 0
+
+
+def test_failed_connect_frees_its_slot():
+    def connect():
+        raise ConnectionError("database unreachable")
+
+    pool = run.ConnectionPool(connect, 1, 0, 0.1, 60)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            pool.acquire()
+    assert (pool.stats()['open'], pool.stats()['in_use']) == (0, 0)
@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import run
+
+ADDRESS = '0x' + 'ab' * 20
+
+
+@pytest.fixture
+def client():
+    run.db_manager.init_database()
+    conn = run.db_manager.get_connection()
+    cursor = conn.cursor()
+    try:
+        run.db_manager.insert_new_wallets(cursor, [(ADDRESS, '0x' + '22' * 32, 'etag')])
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    return TestClient(run.app, headers={'X-API-Key': 'test'})
+
+
+@pytest.mark.parametrize('path', ['/transactions', f'/wallet/{ADDRESS}/transactions'])
+def test_each_representation_has_its_own_tag(client, path):
+    json_tag = client.get(path).headers['ETag']
+    assert client.get(path, headers={'If-None-Match': json_tag}).status_code == 304
+
+    for variant in ({'format': 'ndjson'}, {'limit': 10}, {'limit': 10, 'after': run.encode_cursor({'created_at': run.datetime(2024, 1, 1), 'id': 1})}):
+        response = client.get(path, params=variant, headers={'If-None-Match': json_tag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != json_tag
+
+
+def test_unknown_wallet_is_not_found_even_with_a_matching_tag(client):
+    unknown = '0x' + 'cd' * 20
+    guessed = run.eth_manager.change_versions.etag(unknown, 'json', None, None)
+    assert client.get(f'/wallet/{unknown}/transactions', headers={'If-None-Match': guessed}).status_code == 404
+
+
+def test_wallet_counters_stay_bounded():
+    versions = run.ChangeVersions(64)
+    wallet = '0x' + 'ab' * 20
+    tag = versions.etag(wallet, 'json')
+
+    # Counterparties of every transfer are bumped too, but they only land in the fixed slots
+    versions.bump('0x%040x' % index for index in range(10000))
+    assert len(versions.wallet_versions) == 64
+
+    versions.bump([wallet.upper().replace('0X', '0x')])
+    assert versions.etag(wallet, 'json') != tag
+    assert versions.etag(wallet.upper().replace('0X', '0x'), 'json') == versions.etag(wallet, 'json')
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+
+import run
+
+
+# Answers eth_feeHistory with a fixed base fee, or fails like an unreachable node
+class StubEth:
+    def __init__(self):
+        self.base_fee = 10
+        self.failing = False
+        self.calls = 0
+
+    def fee_history(self, blocks, newest, percentiles):
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("node unreachable")
+        return {'baseFeePerGas': [self.base_fee], 'gasUsedRatio': [0.5], 'reward': [[1, 2, 3]]}
+
+
+@pytest.fixture
+def oracle(monkeypatch):
+    monkeypatch.setenv('FEE_ORACLE_INTERVAL', '12')
+    monkeypatch.setenv('FEE_MAX_AGE', '60')
+    monkeypatch.setenv('FEE_BASE_FEE_MULTIPLIER', '1')
+    eth = StubEth()
+    oracle = run.FeeOracle(SimpleNamespace(w3=SimpleNamespace(eth=eth, from_wei=lambda value, unit: value)))
+    return oracle, eth
+
+
+def test_sends_use_the_background_sample_while_it_is_fresh(oracle):
+    oracle, eth = oracle
+    oracle.run_once()
+    eth.base_fee = 50
+    assert oracle.get_fees('normal') == (12, 2)
+    assert eth.calls == 1
+
+
+def test_stale_sample_is_replaced_before_a_send(oracle):
+    oracle, eth = oracle
+    oracle.run_once()
+    oracle.sampled_at -= 61
+    eth.base_fee = 50
+    assert oracle.get_fees('normal') == (52, 2)
+    assert oracle.stats()['age'] < 1
+
+
+def test_stale_sample_is_not_used_when_the_node_is_unreachable(oracle):
+    oracle, eth = oracle
+    oracle.run_once()
+    oracle.sampled_at -= 61
+    eth.failing = True
+    with pytest.raises(ConnectionError):
+        oracle.get_fees('normal')
+    assert oracle.stats()['age'] > oracle.stats()['max_age']
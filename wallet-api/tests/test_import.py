@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import run
+
+KEYS = ['0x' + f"{index:02x}" * 32 for index in range(1, 4)]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    run.db_manager.init_database()
+    monkeypatch.setattr(run.block_indexer, 'load_addresses', lambda notify=True: None)
+    # No startup events: the tests only need the database, not the background jobs
+    return TestClient(run.app, headers={'X-API-Key': 'test'})
+
+
+def import_body(client, body: bytes, chunk_size: int = 7) -> dict:
+    # Send the body in small pieces so lines are split across chunks like a real upload
+    chunks = (body[start:start + chunk_size] for start in range(0, len(body), chunk_size))
+    response = client.post('/wallets/import/bulk', content=chunks, headers={'Content-Type': 'text/csv'})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_non_utf8_line_is_reported_and_the_rest_imported(client):
+    body = b"private_key,wallet_name\n" + f"{KEYS[0]},first\n".encode() + b"\xff\xfe,abc\n" + f"{KEYS[1]},second\n".encode()
+    result = import_body(client, body)
+
+    assert result['imported'] + result['duplicates'] == 2
+    assert result['invalid'] == 1
+    assert {'line': 3, 'error': "Line is not valid UTF-8"} in result['errors']
+
+
+def test_oversized_line_is_dropped_while_streaming(client, monkeypatch):
+    monkeypatch.setattr(run, 'IMPORT_MAX_LINE_BYTES', 100)
+    body = b"a" * 1000 + b"\n" + f"{KEYS[2]},third\n".encode() + b"b" * 1000
+    result = import_body(client, body)
+
+    assert result['imported'] + result['duplicates'] == 1
+    assert result['invalid'] == 2
+    assert [error['line'] for error in result['errors']] == [1, 3]
+    assert all(error['error'] == "Line longer than 100 bytes" for error in result['errors'])
@@ -0,0 +1,151 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import run
+from benchmark import FakeChain, FakeRPCHandler
+
+WALLET = '0x' + '12' * 20
+SENDER = '0x' + '34' * 20
+
+
+@pytest.fixture
+def non_utc_host(monkeypatch):
+    monkeypatch.setenv('TZ', 'Asia/Tokyo')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def wallet_id(tmp_path, monkeypatch):
+    monkeypatch.setenv('SQLITE_PATH', str(tmp_path / 'wallet.db'))
+    db_manager = run.SQLiteDatabaseManager()
+    db_manager.init_database()
+    monkeypatch.setattr(run, 'db_manager', db_manager)
+    monkeypatch.setattr(run.block_indexer, 'db_manager', db_manager)
+
+    conn = db_manager.get_connection()
+    cursor = conn.cursor()
+    try:
+        wallet_id = db_manager.insert_wallet(cursor, WALLET, '0x' + '56' * 32, 'indexed')
+        conn.commit()
+        return wallet_id
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def test_indexed_and_sent_transactions_share_a_clock(non_utc_host, wallet_id, monkeypatch):
+    # A send takes the CURRENT_TIMESTAMP default; an incoming transfer takes its block's timestamp
+    run.record_transactions([(wallet_id, '0x' + '01' * 32, WALLET, SENDER, 0.001, 'PENDING')])
+
+    monkeypatch.setattr(run.block_indexer, 'wallet_ids', {WALLET: wallet_id})
+    monkeypatch.setattr(run.eth_manager, 'get_receipts', lambda tx_hashes: {})
+    monkeypatch.setattr(run.eth_manager, 'notify_balances', lambda addresses, notify=True: None)
+    run.block_indexer.index_blocks([{
+        'number': hex(1),
+        'hash': '0x' + '02' * 32,
+        'parentHash': '0x' + '00' * 32,
+        'timestamp': hex(int(time.time())),
+        'transactions': [{'hash': '0x' + '03' * 32, 'from': SENDER, 'to': WALLET, 'value': hex(10 ** 15)}]
+    }])
+
+    conn = run.db_manager.get_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT direction, created_at FROM transactions ORDER BY id")
+        sent, received = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    assert (sent['direction'], received['direction']) == ('OUT', 'IN')
+    assert abs((received['created_at'] - sent['created_at']).total_seconds()) < 60
+
+
+def snapshot() -> tuple[list[tuple[str, str, float]], dict, list[dict]]:
+    # Transactions, the wallet's stats and the indexed blocks (newest first)
+    conn = run.db_manager.get_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT direction, tx_hash, amount FROM transactions ORDER BY id")
+        rows = [(row['direction'], row['tx_hash'], float(row['amount'])) for row in cursor.fetchall()]
+        return rows, run.db_manager.get_wallet_stats(cursor, WALLET), run.db_manager.recent_indexed_blocks(cursor, 12)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def fork_block(chain: FakeChain, number: int, fork: int, parent_hash: str, transfers: list[tuple[str, float]]) -> dict:
+    # Blocks of different forks at the same height get different hashes
+    block = chain.make_block(number, [])
+    block['hash'] = '0x%064x' % (fork * 10 ** 6 + number)
+    block['parentHash'] = parent_hash
+    for index, (tx_hash, amount) in enumerate(transfers):
+        block['transactions'].append({'hash': tx_hash, 'from': SENDER, 'to': WALLET, 'value': hex(int(amount * 10 ** 18))})
+        chain.receipts[tx_hash] = {
+            'transactionHash': tx_hash, 'blockNumber': hex(number), 'status': '0x1',
+            'gasUsed': hex(21000), 'effectiveGasPrice': hex(10 ** 9)
+        }
+    return block
+
+
+def test_reorg_replaces_orphaned_transfers(wallet_id, tmp_path, monkeypatch):
+    chain = FakeChain(11155111, block_time=60)
+    FakeRPCHandler.chain = chain
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeRPCHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv('ETH_RPC_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv('INDEXER_START_BLOCK', '1')
+    eth_manager = run.EthereumManager()
+    monkeypatch.setattr(eth_manager, 'notify_balances', lambda addresses, notify=True: None)
+    indexer = run.BlockIndexer(run.db_manager, eth_manager)
+    indexer.wallet_ids = {WALLET: wallet_id}
+
+    # A send of our own, not yet mined, must survive the rollback
+    run.record_transactions([(wallet_id, '0x' + 'aa' * 32, WALLET, SENDER, 0.01, 'PENDING')])
+
+    orphaned = ['0x' + 'a1' * 32, '0x' + 'a2' * 32]
+    canonical = '0x' + 'b1' * 32
+    try:
+        # Blocks 1-3 on fork A, with two incoming transfers
+        block_1 = fork_block(chain, 1, 1, chain.blocks[0]['hash'], [])
+        block_2a = fork_block(chain, 2, 1, block_1['hash'], [(orphaned[0], 1.0)])
+        block_3a = fork_block(chain, 3, 1, block_2a['hash'], [(orphaned[1], 2.0)])
+        chain.blocks[1:] = [block_1, block_2a, block_3a]
+        indexer.run_once()
+
+        # Fork B replaces blocks 2-3 and grows to 4, with a different transfer
+        block_2b = fork_block(chain, 2, 2, block_1['hash'], [])
+        block_3b = fork_block(chain, 3, 2, block_2b['hash'], [(canonical, 0.5)])
+        block_4b = fork_block(chain, 4, 2, block_3b['hash'], [])
+        chain.blocks[2:] = [block_2b, block_3b, block_4b]
+
+        rows, stats, blocks = snapshot()
+        assert [tx_hash for direction, tx_hash, _ in rows if direction == 'IN'] == orphaned
+        assert (stats['received_count'], stats['received_amount']) == (2, 3.0)
+
+        # The first round finds the fork and rolls back to block 1
+        indexer.run_once()
+        rows, stats, blocks = snapshot()
+        assert rows == [('OUT', '0x' + 'aa' * 32, 0.01)]
+        assert (stats['received_count'], stats['received_amount'], stats['pending_count']) == (0, 0, 1)
+        assert [block['block_number'] for block in blocks] == [1]
+
+        # The next round indexes the new fork
+        indexer.run_once()
+        rows, stats, blocks = snapshot()
+        assert rows == [('OUT', '0x' + 'aa' * 32, 0.01), ('IN', canonical, 0.5)]
+        assert (stats['received_count'], stats['received_amount'], stats['transaction_count']) == (1, 0.5, 2)
+        assert blocks[0]['block_hash'] == block_4b['hash']
+
+        # And the running totals agree with a rebuild from the rows
+        run.rebuild_stats()
+        assert snapshot()[1] == stats
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,131 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import run
+
+
+# Records the statements a query helper runs, so the test plans exactly the SQL the API sends
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params or ()))
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, cursor: RecordingCursor):
+        self._cursor = cursor
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db_manager(tmp_path, monkeypatch):
+    monkeypatch.setenv('SQLITE_PATH', str(tmp_path / 'wallet.db'))
+    db_manager = run.SQLiteDatabaseManager()
+    db_manager.init_database()
+    return db_manager
+
+
+@pytest.fixture
+def seeded(db_manager):
+    # 100k transactions over 1000 wallets, 1% of them still PENDING
+    rng = random.Random(1)
+    conn = db_manager.get_connection()
+    cursor = conn.cursor()
+    try:
+        db_manager.insert_new_wallets(
+            cursor,
+            [('0x%040x' % wallet_id, '0x' + '11' * 32, f"wallet {wallet_id}") for wallet_id in range(1, 1001)]
+        )
+        started = datetime(2024, 1, 1)
+        db_manager.insert_indexed_transactions(
+            cursor,
+            [
+                (
+                    rng.randint(1, 1000),
+                    '0x%064x' % index,
+                    '0x%040x' % 1,
+                    '0x%040x' % 2,
+                    0.001,
+                    0.0,
+                    'PENDING' if rng.random() < 0.01 else 'SUCCESS',
+                    'OUT',
+                    None,
+                    started + timedelta(seconds=index)
+                )
+                for index in range(100000)
+            ]
+        )
+        cursor.execute("ANALYZE")
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    return db_manager
+
+
+def query_plan(db_manager, query: str, params) -> str:
+    conn = db_manager.get_connection(readonly=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        return "\n".join(row[-1] for row in cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def test_migrations_record_the_latest_schema_version(db_manager):
+    assert db_manager.schema_is_current()
+
+    # Running them again on an up-to-date database is a no-op
+    db_manager.create_schema()
+    assert db_manager.schema_is_current()
+
+
+def test_pending_scan_uses_the_status_index(seeded, monkeypatch):
+    cursor = RecordingCursor()
+    monkeypatch.setattr(seeded, 'get_connection', lambda readonly=False: RecordingConnection(cursor))
+    run.get_pending_transactions(seeded)
+    monkeypatch.undo()
+
+    [(query, params)] = cursor.statements
+    plan = query_plan(seeded, query, params)
+    assert 'USING INDEX idx_transactions_status' in plan
+
+
+@pytest.mark.parametrize('after', [None, (datetime(2024, 1, 2), 86400)])
+def test_wallet_history_uses_the_wallet_created_index(seeded, after):
+    cursor = RecordingCursor()
+    seeded.list_transactions(cursor, 7, after, 100)
+
+    [(query, params)] = cursor.statements
+    plan = query_plan(seeded, query, params)
+    assert 'USING INDEX idx_transactions_wallet_created' in plan
+    assert 'USE TEMP B-TREE FOR ORDER BY' not in plan
+
+
+def test_sqlite_statements_are_not_rewritten(db_manager):
+    # Queries use the backend's own placeholder, so a literal %s reaches SQLite untouched
+    conn = db_manager.get_connection(readonly=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT '%s', ?", ('x',))
+        assert cursor.fetchone() == ('%s', 'x')
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import run
+
+ADDRESS = '0x' + '34' * 20
+
+
+# Stands in for eth_getTransactionCount(pending); counts how often the node is asked
+class StubNode:
+    def __init__(self, pending: int):
+        self.pending = pending
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, address):
+        with self.lock:
+            self.calls += 1
+        return self.pending
+
+
+def reserve_many(managers: list, count: int) -> list[int]:
+    # Spread the reserves over 16 threads and every manager
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        return list(executor.map(lambda index: managers[index % len(managers)].reserve(ADDRESS), range(count)))
+
+
+def test_concurrent_reserves_get_distinct_nonces():
+    node = StubNode(10)
+    nonces = reserve_many([run.NonceManager(node)], 800)
+    assert sorted(nonces) == list(range(10, 810))
+    assert node.calls == 1
+
+
+def test_released_gap_is_reused_first():
+    manager = run.NonceManager(StubNode(0))
+    assert [manager.reserve(ADDRESS) for _ in range(5)] == [0, 1, 2, 3, 4]
+
+    manager.release(ADDRESS, 2)
+    assert manager.reserve(ADDRESS) == 2
+    assert manager.reserve(ADDRESS) == 5
+
+    # Releasing the newest nonces moves the counter back instead of leaving gaps
+    manager.release(ADDRESS, 4)
+    manager.release(ADDRESS, 5)
+    assert manager.states[ADDRESS.lower()] == {'next': 4, 'released': set()}
+
+    # A nonce that was never handed out is ignored
+    manager.release(ADDRESS, 9)
+    assert manager.reserve(ADDRESS) == 4
+
+
+def test_nonce_too_low_resyncs_from_the_node():
+    node = StubNode(3)
+    eth_manager = run.EthereumManager()
+    eth_manager.nonce_manager = run.NonceManager(node)
+    nonce = eth_manager.nonce_manager.reserve(ADDRESS)
+
+    # Another signer used the account meanwhile
+    node.pending = 8
+    eth_manager.handle_send_error(ADDRESS, nonce, ValueError("nonce too low: next nonce 8, tx nonce 3"))
+    assert eth_manager.nonce_manager.reserve(ADDRESS) == 8
+    assert node.calls == 2
+
+    # Any other error only gives the nonce back
+    eth_manager.handle_send_error(ADDRESS, 8, ValueError("insufficient funds"))
+    assert eth_manager.nonce_manager.reserve(ADDRESS) == 8
+    assert node.calls == 2
+
+
+@pytest.mark.skipif(run.fcntl is None, reason="SharedNonceManager needs flock")
+def test_shared_managers_never_hand_out_the_same_nonce(tmp_path):
+    # Two workers' managers: separate in-process locks, one directory, so only the flock keeps them apart
+    node = StubNode(100)
+    managers = [run.SharedNonceManager(node, str(tmp_path)), run.SharedNonceManager(node, str(tmp_path))]
+    nonces = reserve_many(managers, 400)
+    assert sorted(nonces) == list(range(100, 500))
+    assert node.calls == 1
+
+    # A gap released by one worker is filled by the other
+    managers[0].release(ADDRESS, 250)
+    assert managers[1].reserve(ADDRESS) == 250
+
+    # A resync in one worker makes the other ask the node again
+    node.pending = 900
+    managers[1].resync(ADDRESS)
+    assert managers[0].reserve(ADDRESS) == 900
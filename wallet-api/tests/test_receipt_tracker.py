@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+import run
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    # Pending transactions and the clock are the test's; refreshes are only counted
+    monkeypatch.setenv('RECEIPT_POLL_INTERVAL', '5')
+    monkeypatch.setenv('RECEIPT_BACKOFF_AFTER', '2')
+    monkeypatch.setenv('RECEIPT_MAX_BACKOFF', '30')
+    pending = []
+    refreshed = []
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(run, 'get_pending_transactions', lambda db_manager: [{'tx_hash': tx_hash} for tx_hash in pending])
+    monkeypatch.setattr(run.time, 'monotonic', lambda: clock.now)
+    eth_manager = SimpleNamespace(refresh_transactions=lambda db_manager, due: refreshed.append([tx['tx_hash'] for tx in due]))
+    return run.ReceiptTracker(None, eth_manager), pending, refreshed, clock
+
+
+def test_backoff_schedule(tracker):
+    tracker = tracker[0]
+    # The base interval for the first RECEIPT_BACKOFF_AFTER checks, then doubling up to RECEIPT_MAX_BACKOFF
+    assert [tracker.backoff(attempts) for attempts in range(1, 7)] == [5, 5, 10, 20, 30, 30]
+
+
+def test_stuck_transaction_is_checked_less_often(tracker):
+    tracker, pending, refreshed, clock = tracker
+    pending.append('0xstuck')
+
+    # One round every second for two minutes
+    checked_at = []
+    for second in range(120):
+        clock.now = 1000.0 + second
+        refreshed.clear()
+        tracker.run_once()
+        if refreshed[0]:
+            checked_at.append(second)
+
+    assert checked_at == [0, 5, 10, 20, 40, 70, 100]
+
+
+def test_confirmed_transactions_leave_the_schedule(tracker):
+    tracker, pending, refreshed, clock = tracker
+    pending.extend(['0xfirst', '0xsecond'])
+    tracker.run_once()
+    assert refreshed == [['0xfirst', '0xsecond']]
+
+    # A new send is checked straight away, without waiting for the others' next check
+    pending.remove('0xfirst')
+    pending.append('0xthird')
+    clock.now += 1
+    tracker.run_once()
+    assert refreshed[-1] == ['0xthird']
+    assert set(tracker.schedule) == {'0xsecond', '0xthird'}
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import run
+
+
+@pytest.fixture
+def client(monkeypatch):
+    run.db_manager.init_database()
+    monkeypatch.setattr(run.block_indexer, 'load_addresses', lambda notify=True: None)
+    return TestClient(run.app)
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    profiler = run.SlowRequestProfiler(str(tmp_path), 0, 0.005, 10)
+    monkeypatch.setattr(run, 'request_profiler', profiler)
+    profiler.start()
+    yield profiler
+    profiler.stop()
+
+
+def test_server_timing_is_only_sent_with_a_valid_key(client):
+    assert 'total;dur=' in client.get('/transactions', headers={'X-API-Key': 'test'}).headers['Server-Timing']
+
+    response = client.get('/transactions', headers={'X-API-Key': 'wrong'})
+    assert response.status_code == 403
+    assert 'Server-Timing' not in response.headers
+
+
+def test_idle_profiler_does_not_poll(profiler, monkeypatch):
+    samples = []
+    run_once = profiler.run_once
+    monkeypatch.setattr(profiler, 'run_once', lambda: samples.append(1) or run_once())
+
+    # Let the sampler go idle, then count its wake-ups for 100 intervals
+    time.sleep(0.05)
+    samples.clear()
+    time.sleep(0.5)
+    assert len(samples) <= 1
+
+
+def test_slow_request_is_written_after_an_idle_period(client, profiler, tmp_path):
+    time.sleep(0.05)
+    assert client.get('/transactions', headers={'X-API-Key': 'test'}).status_code == 200
+
+    deadline = time.monotonic() + 5
+    while not list(tmp_path.glob('*.json')) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    [profile] = tmp_path.glob('*.json')
+    assert '"route": "/transactions"' in profile.read_text()
+
+
+def test_metrics_need_the_api_key(client, monkeypatch):
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'X-API-Key': 'test'}).status_code == 200
+
+    monkeypatch.setattr(run, 'METRICS_PUBLIC', True)
+    assert client.get('/metrics').status_code == 200
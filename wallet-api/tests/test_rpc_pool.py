@@ -0,0 +1,55 @@
+import threading
+import time
+
+import run
+
+
+# Answers like a node after a fixed delay and records which thread asked
+class StubProvider:
+    def __init__(self, name: str, delay: float):
+        self.name = name
+        self.delay = delay
+        self.threads = []
+
+    def make_request(self, method, params):
+        self.threads.append(threading.get_ident())
+        time.sleep(self.delay)
+        return {'jsonrpc': '2.0', 'id': 1, 'result': self.name}
+
+
+def provider_pool(monkeypatch, delays: list[float], hedge_threads: int = 32) -> run.RPCProviderPool:
+    monkeypatch.setenv('RPC_HEDGE_THREADS', str(hedge_threads))
+    pool = run.RPCProviderPool([f"http://node-{index}" for index in range(len(delays))], 0.05, 5, 10)
+    for index, (endpoint, delay) in enumerate(zip(pool.endpoints, delays)):
+        endpoint.provider = StubProvider(f"node-{index}", delay)
+        endpoint.latency = index * 0.001  # Fixes the ranking: node-0 first
+    return pool
+
+
+def test_single_endpoint_reads_stay_on_the_callers_thread(monkeypatch):
+    pool = provider_pool(monkeypatch, [0.0])
+    assert pool.make_request('eth_getBalance', [])['result'] == 'node-0'
+    assert pool.endpoints[0].provider.threads == [threading.get_ident()]
+    assert pool.hedge_busy == 0
+
+
+def test_slow_read_is_hedged_on_the_next_endpoint(monkeypatch):
+    pool = provider_pool(monkeypatch, [1.0, 0.0])
+    started = time.monotonic()
+    assert pool.make_request('eth_getBalance', [])['result'] == 'node-1'
+    assert time.monotonic() - started < 0.5
+
+
+def test_busy_hedge_threads_do_not_hold_up_new_reads(monkeypatch):
+    # One hedge thread, held by a slow read; the next read goes in turn on its own thread instead of queueing
+    pool = provider_pool(monkeypatch, [1.0, 0.0], hedge_threads=1)
+    slow = threading.Thread(target=pool.make_request, args=('eth_getBalance', []))
+    slow.start()
+    time.sleep(0.1)
+
+    pool.endpoints[0].provider.delay = 0.0
+    started = time.monotonic()
+    assert pool.make_request('eth_getBalance', [])['result'] == 'node-0'
+    assert time.monotonic() - started < 0.5
+    assert pool.endpoints[0].provider.threads[-1] == threading.get_ident()
+    slow.join()
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+import pytest
+
+import run
+
+SENDER = '0x' + '12' * 20
+
+
+class StubSigner:
+    def sign_transaction(self, transaction):
+        return SimpleNamespace(raw_transaction=bytes([transaction['nonce']]))
+
+
+@pytest.fixture
+def eth_manager(monkeypatch):
+    eth_manager = run.EthereumManager()
+    eth_manager.nonce_manager = run.NonceManager(lambda address: 7)
+    monkeypatch.setattr(eth_manager, 'get_signer', lambda address, private_key: StubSigner())
+    monkeypatch.setattr(eth_manager, 'build_transaction', lambda nonce, to_address, amount, urgency: {'nonce': nonce})
+    return eth_manager
+
+
+def send(eth_manager, monkeypatch, batch_response) -> list:
+    monkeypatch.setattr(eth_manager.w3.provider, 'make_batch_request', lambda batch_requests: batch_response)
+    transfers = [SimpleNamespace(from_address=SENDER, to_address=SENDER, amount=0.1, urgency='normal')] * 2
+    return eth_manager.send_transactions(transfers, [None, None])
+
+
+@pytest.mark.parametrize('batch_response, message', [
+    ({'jsonrpc': '2.0', 'id': None, 'error': None}, "Ethereum node returned no result"),
+    ({'jsonrpc': '2.0', 'id': None, 'error': "rate limited"}, "rate limited"),
+    ("rate limited", "rate limited"),
+    ({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': "batch too large"}}, "batch too large"),
+])
+def test_rejected_batch_gives_every_transfer_an_error(eth_manager, monkeypatch, batch_response, message):
+    assert send(eth_manager, monkeypatch, batch_response) == [(None, message), (None, message)]
+
+    # Neither nonce was used, so both are handed out again
+    assert [eth_manager.nonce_manager.reserve(SENDER) for _ in range(2)] == [7, 8]
+
+
+def test_per_transfer_errors_of_any_shape(eth_manager, monkeypatch):
+    results = send(eth_manager, monkeypatch, [{'id': 0, 'error': "underpriced"}, {'id': 1, 'result': '0xabc'}])
+    assert results == [(None, "underpriced"), ('0xabc', None)]
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import run
+
+SENDER = '0x' + '21' * 20
+RECEIVER = '0x' + '43' * 20
+OUTSIDER = '0x' + '65' * 20
+GAS = {'gasUsed': hex(21000), 'effectiveGasPrice': hex(10 ** 9)}
+
+
+def tx_hash(number: int) -> str:
+    return '0x%064x' % number
+
+
+@pytest.fixture
+def chain(tmp_path, monkeypatch):
+    # A fresh database and a node whose receipts the test hands out
+    monkeypatch.setenv('SQLITE_PATH', str(tmp_path / 'wallet.db'))
+    db_manager = run.SQLiteDatabaseManager()
+    db_manager.init_database()
+    monkeypatch.setattr(run, 'db_manager', db_manager)
+    monkeypatch.setattr(run.block_indexer, 'db_manager', db_manager)
+
+    conn = db_manager.get_connection()
+    cursor = conn.cursor()
+    try:
+        wallet_ids = {address: db_manager.insert_wallet(cursor, address, '0x' + '99' * 32, 'stats') for address in (SENDER, RECEIVER)}
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    monkeypatch.setattr(run.block_indexer, 'wallet_ids', {address.lower(): wallet_id for address, wallet_id in wallet_ids.items()})
+
+    receipts = {}
+    monkeypatch.setattr(run.eth_manager, 'get_receipts', lambda tx_hashes: {h: receipts[h] for h in tx_hashes if h in receipts})
+    monkeypatch.setattr(run.eth_manager, 'notify_balances', lambda addresses, notify=True: None)
+    return wallet_ids, receipts
+
+
+def block(number: int, transactions: list[tuple[int, str, str, float]]) -> dict:
+    return {
+        'number': hex(number),
+        'hash': '0x%064x' % (10 ** 6 + number),
+        'parentHash': '0x%064x' % (10 ** 6 + number - 1),
+        'timestamp': hex(int(time.time())),
+        'transactions': [
+            {'hash': tx_hash(number_), 'from': from_address, 'to': to_address, 'value': hex(int(amount * 10 ** 18))}
+            for number_, from_address, to_address, amount in transactions
+        ]
+    }
+
+
+def test_running_totals_match_a_rebuild(chain):
+    wallet_ids, receipts = chain
+    client = TestClient(run.app, headers={'X-API-Key': 'test'})
+
+    # Three sends go out PENDING
+    run.record_transactions([
+        (wallet_ids[SENDER], tx_hash(1), SENDER, RECEIVER, 0.5, 'PENDING'),
+        (wallet_ids[SENDER], tx_hash(2), SENDER, OUTSIDER, 0.25, 'PENDING'),
+        (wallet_ids[SENDER], tx_hash(3), SENDER, RECEIVER, 1.0, 'PENDING')
+    ])
+
+    # One succeeds, one fails, one is still pending
+    receipts[tx_hash(1)] = {'status': '0x1', **GAS}
+    receipts[tx_hash(2)] = {'status': '0x0', **GAS}
+    run.eth_manager.refresh_transactions(run.db_manager)
+
+    # The indexer finds the receiving side of the first send and an incoming transfer without a receipt yet
+    run.block_indexer.index_blocks([block(1, [(1, SENDER, RECEIVER, 0.5), (4, OUTSIDER, SENDER, 2.0)])])
+
+    # Both outstanding transfers settle
+    receipts[tx_hash(3)] = {'status': '0x1', **GAS}
+    receipts[tx_hash(4)] = {'status': '0x1', **GAS}
+    run.eth_manager.refresh_transactions(run.db_manager)
+
+    running = {address: client.get(f'/wallet/{address}/stats').json() for address in (SENDER, RECEIVER)}
+    run.rebuild_stats()
+    rebuilt = {address: client.get(f'/wallet/{address}/stats').json() for address in (SENDER, RECEIVER)}
+
+    assert running == rebuilt
+    assert running[SENDER]['transaction_count'] == 4
+    assert (running[SENDER]['sent_count'], running[SENDER]['failed_count'], running[SENDER]['received_amount']) == (2, 1, 2.0)
+    assert (running[RECEIVER]['received_count'], running[RECEIVER]['received_amount']) == (1, 0.5)
+    assert running[SENDER]['pending_count'] == running[RECEIVER]['pending_count'] == 0
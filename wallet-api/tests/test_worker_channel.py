@@ -0,0 +1,46 @@
+import json
+import os
+import threading
+
+import run
+
+
+def test_large_balance_updates_reach_the_other_workers(tmp_path, monkeypatch):
+    received = []
+    done = threading.Event()
+
+    def on_balances(addresses):
+        received.extend(addresses)
+        if len(received) >= 3000:
+            done.set()
+
+    # Both channels live in this process, so each gets its own socket name
+    receiver = run.WorkerChannel(str(tmp_path), {'balances': on_balances})
+    receiver.path = os.path.join(str(tmp_path), 'worker-receiver.sock')
+    sender = run.WorkerChannel(str(tmp_path), {})
+    sender.path = os.path.join(str(tmp_path), 'worker-sender.sock')
+    receiver.start()
+    sender.start()
+    monkeypatch.setattr(run, 'worker_channel', sender)
+    try:
+        addresses = ['0x%040x' % index for index in range(3000)]
+        # Every address twice, as a finished batch reports both ends of each transfer
+        payload = addresses + [address.upper().replace('0X', '0x') for address in addresses]
+        assert len(json.dumps({'type': 'balances', 'addresses': payload})) > 65536
+
+        run.eth_manager.notify_balances(payload)
+        assert done.wait(5)
+        assert received == addresses
+    finally:
+        sender.stop()
+        receiver.stop()
+
+
+def test_oversized_message_is_not_sent(tmp_path, capsys):
+    channel = run.WorkerChannel(str(tmp_path), {})
+    channel.start()
+    try:
+        channel.publish('balances', {'addresses': ['0x%040x' % index for index in range(2000)]})
+        assert 'balances message is' in capsys.readouterr().out
+    finally:
+        channel.stop()
@@ -4,7 +4,11 @@ import time
 import random
 import json
 import base64
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 def resource_path(relative_path):
@@ -25,6 +29,10 @@ if not api_key:
     print("\033[91mError: X-API-Key not found in .env or vars.py\033[0m")
     sys.exit(1)
 
+# Request settings
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 10))
+CACHE_FILE = os.path.expanduser(os.getenv("WALLET_CACHE", "~/.brsk_wallet_cache.json"))
+
 # Realistic typing function
 def realistic_typing(text):
     for char in text:
@@ -32,49 +40,154 @@ def realistic_typing(text):
         time.sleep(random.uniform(0.05, 0.1))
     print()
 
+# Clear the terminal without starting a shell
+def clear_screen():
+    print("\033[H\033[2J", end="", flush=True)
+
 # Client Class
 class Client:
     def __init__(self):
         self.base_url = os.getenv("HOST")
         self.api_key = api_key
         self.headers = {"X-API-Key": self.api_key}
-        self.version = self.get_version()
-        self.wallets = []
-        self.get_wallets()
+        self.session = self.create_session()
         self.current_wallet = None
-        os.system("clear")
+        # path -> (etag, data) of the last full response, reused when the API answers 304
+        self.etags = {}
+
+        # Show the cached wallet list right away and refresh it in the background
+        cache = self.load_cache()
+        if cache:
+            self.version = cache["version"]
+            self.wallets = cache["wallets"]
+            if cache.get("wallets_etag"):
+                self.etags["/wallets"] = (cache["wallets_etag"], self.wallets)
+            threading.Thread(target=self.refresh, daemon=True).start()
+        else:
+            self.version, self.wallets = self.fetch_startup_data()
+            self.save_cache()
+        clear_screen()
+
+    def create_session(self):
+        # One keep-alive connection pool for every request; only idempotent requests are retried
+        session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=["GET", "DELETE"])
+        adapter = HTTPAdapter(max_retries=retries)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def load_cache(self):
+        try:
+            with open(CACHE_FILE) as cache_file:
+                cache = json.load(cache_file)
+            if cache.get("base_url") == self.base_url:
+                return cache
+        except Exception:
+            pass
+        return None
+
+    def save_cache(self):
+        # Only public wallet data is cached, never private keys
+        try:
+            with open(CACHE_FILE, "w") as cache_file:
+                json.dump({
+                    "base_url": self.base_url,
+                    "version": self.version,
+                    "wallets": self.wallets,
+                    "wallets_etag": self.etags.get("/wallets", (None,))[0]
+                }, cache_file)
+        except Exception:
+            pass
+
+    def fetch_startup_data(self):
+        # Version and wallets don't depend on each other, so fetch them at the same time
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            version = executor.submit(self.get_version)
+            wallets = executor.submit(self.fetch_wallets)
+            version = version.result()
+            try:
+                return version, wallets.result()
+            except Exception as e:
+                print(f"\033[91mError: Failed to get wallets: {e}\033[0m")
+                return version, []
+
+    def refresh(self):
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                version = executor.submit(self.fetch_version)
+                wallets = executor.submit(self.fetch_wallets)
+                self.version = version.result()
+                self.set_wallets(wallets.result())
+        except PermissionError:
+            # A wrong key fails every action, so stop instead of showing the cached data
+            print("\n\033[91mError: Invalid API-Key\033[0m", flush=True)
+            os._exit(1)
+        except Exception:
+            # Keep showing the cached data
+            pass
+
+    def fetch_version(self):
+        response = self.session.get(f"{self.base_url}/version", timeout=REQUEST_TIMEOUT)
+        if response.status_code == 403:
+            raise PermissionError("Invalid API-Key")
+        response.raise_for_status()
+        return response.json()["version"]
 
     def get_version(self):
         try:
-            response = requests.get(f"{self.base_url}/version", headers=self.headers)
-            if response.status_code == 403:
-                print("\033[91mError: Invalid API-Key\033[0m")
-                sys.exit(1)
-            return response.json()["version"]
+            return self.fetch_version()
+        except PermissionError:
+            print("\033[91mError: Invalid API-Key\033[0m")
+            sys.exit(1)
         except Exception as e:
             print(f"\033[91mError: Failed to connect to the API: {e}\033[0m")
             sys.exit(1)
 
+    def conditional_get(self, path):
+        # Send the last ETag so unchanged data comes back as an empty 304
+        cached = self.etags.get(path)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = self.session.get(f"{self.base_url}{path}", headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code != 200:
+            raise Exception(response.text)
+
+        data = response.json()
+        if response.headers.get("ETag"):
+            self.etags[path] = (response.headers["ETag"], data)
+        return data
+
+    def fetch_wallets(self):
+        return self.conditional_get("/wallets")
+
+    def set_wallets(self, wallets):
+        self.wallets = wallets
+        self.save_cache()
+
+        # Keep the selected wallet's balance current
+        if self.current_wallet:
+            for wallet in wallets:
+                if wallet["address"] == self.current_wallet.get("address"):
+                    self.current_wallet = wallet
+
     def get_wallets(self):
         try:
-            response = requests.get(f"{self.base_url}/wallets", headers=self.headers)
-            if response.status_code == 200:
-                self.wallets = response.json()
-            else:
-                print(f"\033[91mError: {response.text}\033[0m")
-                self.wallets = []
+            self.set_wallets(self.fetch_wallets())
         except Exception as e:
             print(f"\033[91mError: Failed to get wallets: {e}\033[0m")
             self.wallets = []
 
     def create_wallet(self):
-        os.system("clear")
+        clear_screen()
         print("\n\033[92mCreate new wallet\033[0m\n")
         try:
             wallet_name = input("Wallet Name > ")
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/wallet/create",
-                headers=self.headers,
+                timeout=REQUEST_TIMEOUT,
                 json={"wallet_name": wallet_name}
             )
             if response.status_code == 200:
@@ -101,14 +214,14 @@ class Client:
             time.sleep(2)
 
     def import_wallet(self):
-        os.system("clear")
+        clear_screen()
         print("\n\033[92mImport wallet\033[0m\n")
         try:
             wallet_name = input("Wallet Name > ")
             private_key = input("Private Key > ")
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/wallet/import",
-                headers=self.headers,
+                timeout=REQUEST_TIMEOUT,
                 json={
                     "wallet_name": wallet_name,
                     "private_key": private_key
@@ -128,12 +241,12 @@ class Client:
 
     def delete_wallet(self):
         if not self.current_wallet:
-            os.system("clear")
+            clear_screen()
             print("\n\033[91mNo wallet selected!\033[0m")
             time.sleep(1.8)
             return
         try:
-            os.system("clear")
+            clear_screen()
             print("\n\033[92mDelete wallet\033[0m")
             print(f"\nWallet: \033[92m{self.current_wallet['wallet_name']}\033[0m")
             print(f"Address: \033[92m{self.current_wallet['address']}\033[0m")
@@ -145,9 +258,9 @@ class Client:
                 time.sleep(1.8)
                 return
 
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.base_url}/wallet/{self.current_wallet['address']}",
-                headers=self.headers
+                timeout=REQUEST_TIMEOUT
             )
 
             if response.status_code == 200:
@@ -167,7 +280,7 @@ class Client:
             input("\nPress Enter to continue...")
 
     def show_transactions(self):
-        os.system("clear")
+        clear_screen()
         if not self.current_wallet:
             print("\n\033[91mNo wallet selected!\033[0m")
             time.sleep(1.8)
@@ -176,53 +289,103 @@ class Client:
         print("\n\033[92mShow transactions\033[0m")
         print(f"Wallet: [\033[92m{self.current_wallet['wallet_name']}\033[0m] \033[92m{self.current_wallet['address']}\033[0m")
 
-        response = requests.get(
-            f"{self.base_url}/wallet/{self.current_wallet['address']}/transactions",
-            headers=self.headers
-        )
-
-        if response.status_code == 200:
-            transactions = response.json()
-            print("\n\033[92mTransactions updated!\033[0m")
-            time.sleep(1)
-            os.system("clear")
+        try:
+            transactions = self.conditional_get(f"/wallet/{self.current_wallet['address']}/transactions")
+        except Exception as e:
+            print(f"\n\033[91mError: {e}\033[0m")
+            input("\nPress Enter to continue...")
+            return
 
-            print("\n\033[92mShow transactions\033[0m")
-            print(f"Wallet: [\033[92m{self.current_wallet['wallet_name']}\033[0m] \033[92m{self.current_wallet['address']}\033[0m")
+        print("\n\033[92mTransactions updated!\033[0m")
+        time.sleep(1)
+        clear_screen()
 
-            if not transactions:
-                print("\n\033[93mNo transactions found\033[0m")
-                input("\nPress Enter to continue...")
-                return
+        print("\n\033[92mShow transactions\033[0m")
+        print(f"Wallet: [\033[92m{self.current_wallet['wallet_name']}\033[0m] \033[92m{self.current_wallet['address']}\033[0m")
 
-            print(f"\n\033[93m{len(transactions)} transactions found\033[0m")
+        if not transactions:
+            print("\n\033[93mNo transactions found\033[0m")
+            input("\nPress Enter to continue...")
+            return
 
-            for transaction in transactions:
-                print("\n" + "="*60)
-                print(f"\nTransaction Hash: \033[92m{transaction['tx_hash']}\033[0m")
-                print(f"Timestamp: {transaction['created_at']}")
-                print(f"Sender: \033[94m{transaction['from_address']}\033[0m")
-                print(f"Receiver: \033[94m{transaction['to_address']}\033[0m")
-                print(f"Amount: \033[1m{transaction['amount']} ETH\033[0m")
-                print(f"Gas: {transaction['gas_used']} ETH")
-                status_color = "\033[92m" if transaction['status'] == "SUCCESS" else "\033[93m" if transaction['status'] == "PENDING" else "\033[91m"
-                print(f"Status: {status_color}{transaction['status']}\033[0m")
+        print(f"\n\033[93m{len(transactions)} transactions found\033[0m")
 
+        for transaction in transactions:
             print("\n" + "="*60)
+            print(f"\nTransaction Hash: \033[92m{transaction['tx_hash']}\033[0m")
+            print(f"Timestamp: {transaction['created_at']}")
+            print(f"Sender: \033[94m{transaction['from_address']}\033[0m")
+            print(f"Receiver: \033[94m{transaction['to_address']}\033[0m")
+            print(f"Amount: \033[1m{transaction['amount']} ETH\033[0m")
+            print(f"Gas: {transaction['gas_used']} ETH")
+            status_color = "\033[92m" if transaction['status'] == "SUCCESS" else "\033[93m" if transaction['status'] == "PENDING" else "\033[91m"
+            print(f"Status: {status_color}{transaction['status']}\033[0m")
+
+        print("\n" + "="*60)
+        input("\nPress Enter to continue...")
+
+    def watch_transactions(self):
+        clear_screen()
+        if not self.current_wallet or not self.current_wallet.get('wallet_name'):
+            print("\n\033[91mNo wallet selected!\033[0m")
+            time.sleep(1.8)
+            return
+
+        print("\n\033[92mWatch transactions\033[0m")
+        print(f"Wallet: [\033[92m{self.current_wallet['wallet_name']}\033[0m] \033[92m{self.current_wallet['address']}\033[0m")
+        print("\nWaiting for updates, press Ctrl+C to stop...")
+
+        # The API pushes status and balance changes, so nothing is polled while the wallet is idle
+        try:
+            with self.session.get(
+                f"{self.base_url}/events",
+                timeout=(REQUEST_TIMEOUT, None),
+                params={"addresses": self.current_wallet['address']},
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    print(f"\n\033[91mError: {response.text}\033[0m")
+                    input("\nPress Enter to continue...")
+                    return
+
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    event = json.loads(line[len("data: "):])
+                    self.show_event(event)
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            print(f"\n\033[91mError: {e}\033[0m")
             input("\nPress Enter to continue...")
-        else:
-            print(f"\n\033[91mError: {response.text}\033[0m")
-            input("\nPress Enter to continue...")
+
+    def show_event(self, event):
+        if event['type'] == "balance":
+            self.current_wallet['balance'] = event['balance']
+            print(f"\nBalance: \033[1m{event['balance']} ETH\033[0m")
+            return
+
+        status_color = "\033[92m" if event['status'] == "SUCCESS" else "\033[93m" if event['status'] == "PENDING" else "\033[91m"
+        print("\n" + "="*60)
+        print(f"\nTransaction Hash: \033[92m{event['tx_hash']}\033[0m")
+        print(f"Sender: \033[94m{event['from_address']}\033[0m")
+        print(f"Receiver: \033[94m{event['to_address']}\033[0m")
+        if event.get('amount') is not None:
+            print(f"Amount: \033[1m{event['amount']} ETH\033[0m")
+        if event.get('gas_used') is not None:
+            print(f"Gas: {event['gas_used']} ETH")
+        print(f"Status: {status_color}{event['status']}\033[0m")
 
     def settings(self):
         while True:
-            os.system("clear")
+            clear_screen()
             print("\n\033[92mWallet Settings\033[0m\n")
             print("1  Create new wallet")
             print("2  Import wallet")
             print("3  Delete current wallet")
             print("4  Show transactions")
-            print("5  Back")
+            print("5  Watch transactions")
+            print("6  Back")
 
             option = input("\nOption > ")
 
@@ -235,14 +398,16 @@ class Client:
             elif option == "4":
                 self.show_transactions()
             elif option == "5":
-                os.system("clear")
+                self.watch_transactions()
+            elif option == "6":
+                clear_screen()
                 break
             else:
                 print("\n\033[91mInvalid option\033[0m")
                 time.sleep(1.8)
 
     def change_wallet(self):
-        os.system("clear")
+        clear_screen()
         print("\n\033[92mAvailable Wallets:\033[0m")
         if not self.wallets:
             print("\n\033[91mNo wallets available!\033[0m")
@@ -260,17 +425,17 @@ class Client:
                 self.current_wallet = self.wallets[choice]
                 print(f"\n\033[92mWallet successfully changed\033[0m")
                 time.sleep(1.8)
-                os.system("clear")
+                clear_screen()
             else:
                 print("\n\033[91mInvalid selection\033[0m")
                 time.sleep(1.8)
         except ValueError:
             print("\n\033[91mInvalid input\033[0m")
             time.sleep(1.8)
-            os.system("clear")
+            clear_screen()
 
     def send_eth(self):
-        os.system("clear")
+        clear_screen()
         if not self.current_wallet:
             print("\n\033[91mNo wallet selected!\033[0m")
             time.sleep(1.8)
@@ -279,31 +444,19 @@ class Client:
             to_address = input("Recipient address > ")
             amount = float(input("ETH amount > "))
 
-            response = requests.get(
-                f"{self.base_url}/wallet/{self.current_wallet['address']}",
-                headers=self.headers
-            )
-            if response.status_code != 200:
-                print(f"\n\033[91mError fetching private key: {response.text}\033[0m")
-                input("\nPress Enter to continue...")
-                return
-
-            wallet_data = response.json()
-            private_key = wallet_data["private_key"]
-
+            # The API signs with the wallet's stored key, so the key never leaves the server
             data = {
                 "from_address": self.current_wallet['address'],
                 "to_address": to_address,
-                "amount": amount,
-                "private_key": private_key
+                "amount": amount
             }
 
-            response = requests.post(f"{self.base_url}/wallet/send", headers=self.headers, json=data)
+            response = self.session.post(f"{self.base_url}/wallet/send", json=data, timeout=REQUEST_TIMEOUT)
             if response.status_code == 200:
                 print(f"\n\033[92mTransaction sent: {response.json()['tx_hash']}\033[0m")
                 print(f"Receiver: \033[94m{to_address}\033[0m")
                 print(f"Amount: \033[94m{amount} ETH\033[0m")
-                print(f"To track the status of the transaction, go to the \033[94mWallet Settings\033[0m and select \033[94mShow transactions\033[0m.")
+                print(f"To track the status of the transaction, go to the \033[94mWallet Settings\033[0m and select \033[94mWatch transactions\033[0m.")
                 input("\nPress Enter to continue...")
             else:
                 error_detail = response.json().get('detail', response.text)
@@ -315,7 +468,7 @@ class Client:
             input("\nPress Enter to continue...")
 
     def menu(self):
-        os.system("clear")
+        clear_screen()
         while True:
             print("\n\033[92mETH Wallet Manager\033[0m", end=" ")
             print(f"v{self.version}")